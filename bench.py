@@ -0,0 +1,399 @@
+"""
+Benchmarks for the simulation engines, composite loading, the assembler
+and the txt CPU.
+
+    python bench.py                     run everything
+    python bench.py --quick -k engine   smaller workloads, names containing "engine"
+    python bench.py --save base.json    store the results as a baseline
+    python bench.py --compare base.json flag results more than --tolerance slower
+
+Every result is a rate (gates/s, vectors/s, instructions/s, lines/s), the
+best of --repeat runs, so higher is better. SPLIT nodes do not count as
+gates. bench_baseline.json is a reference run at the default scale;
+rates depend on the machine, so save a baseline of your own before
+comparing against it on different hardware.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(ROOT, "txt"))
+
+from sim import LevelizedSim, EventSim, BitSliceSim
+from sim.chip import COMPOSITE, load_composite_from_json
+from sim.codegen import compile_spec
+from sim.generate import layered, adder_array
+
+import txt
+from compiler import compile_asm, assemble
+
+
+class _Builder:
+    """Spec builder that inserts SPLIT nodes for wires with several readers."""
+
+    def __init__(self):
+        self.types = {}
+        self.readers = {}
+        self.inputs = []
+
+    def input(self):
+        ref = ("in", len(self.inputs))
+        self.inputs.append(ref)
+        self.readers[ref] = []
+        return ref
+
+    def gate(self, t, *refs):
+        nid = f"g{len(self.types)}"
+        self.types[nid] = t
+        for label, ref in zip("AB", refs):
+            self.readers[ref].append((nid, label))
+        out = (nid, "A")
+        self.readers[out] = []
+        return out
+
+    def spec(self, outputs):
+        for i, ref in enumerate(outputs):
+            self.readers[ref].append(("out", i))
+        nodes = [{"id": nid, "type": t} for nid, t in self.types.items()]
+        connections = []
+        interface_inputs = []
+        interface_outputs = [None] * len(outputs)
+        for ref, readers in self.readers.items():
+            if not readers:
+                continue
+            if len(readers) == 1:
+                sources = [ref]
+            else:
+                sid = f"s{len(nodes)}"
+                labels = [f"O{j}" for j in range(len(readers))]
+                nodes.append({"id": sid, "type": "SPLIT", "outputs": labels})
+                if ref[0] == "in":
+                    interface_inputs.append((ref[1], {"chip_id": sid, "label": "A"}))
+                else:
+                    connections.append({"src_id": ref[0], "src_label": ref[1], "dst_id": sid, "dst_label": "A"})
+                sources = [(sid, lbl) for lbl in labels]
+            for src, (dst, label) in zip(sources, readers):
+                if dst == "out":
+                    interface_outputs[label] = {"chip_id": src[0], "label": str(label), "out_label": src[1]}
+                elif src[0] == "in":
+                    interface_inputs.append((src[1], {"chip_id": dst, "label": label}))
+                else:
+                    connections.append({"src_id": src[0], "src_label": src[1], "dst_id": dst, "dst_label": label})
+        return {
+            "nodes": nodes,
+            "connections": connections,
+            "interface_inputs": [m for _, m in sorted(interface_inputs, key=lambda im: im[0])],
+            "interface_outputs": interface_outputs,
+        }
+
+
+def ripple_chain(n):
+    """n inputs folded through alternating AND/OR gates, one long path."""
+    b = _Builder()
+    acc = b.input()
+    for i in range(1, n):
+        acc = b.gate("AND" if i % 2 else "OR", acc, b.input())
+    return b.spec([acc])
+
+
+def mux_tree(depth):
+    """4-valued 2:1 muxes, OR(AND(a, s), AND(b, NOT s)), over 2^depth inputs."""
+    b = _Builder()
+    level = [b.input() for _ in range(2 ** depth)]
+    for _ in range(depth):
+        s = b.input()
+        ns = b.gate("NOT", s)
+        level = [
+            b.gate("OR", b.gate("AND", level[i], s), b.gate("AND", level[i + 1], ns))
+            for i in range(0, len(level), 2)
+        ]
+    return b.spec(level)
+
+
+def reconvergent_dag(width, depth, seed=0):
+    """Layers of `width` gates, each reading two random wires of the layer below."""
+    r = random.Random(seed)
+    b = _Builder()
+    layer = [b.input() for _ in range(width)]
+    for _ in range(depth):
+        nxt = []
+        for i in range(width):
+            t = r.choice(("AND", "OR", "AND", "OR", "NOT"))
+            if t == "NOT":
+                nxt.append(b.gate(t, layer[i]))
+            else:
+                nxt.append(b.gate(t, layer[i], layer[r.randrange(width)]))
+        layer = nxt
+    return b.spec(layer)
+
+
+def _best(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return max(best, 1e-9)
+
+
+def _gates(spec):
+    # SPLIT nodes only fan a wire out; they are not counted as gates.
+    return sum(1 for n in spec["nodes"] if n["type"] != "SPLIT")
+
+
+def _vectors(spec, n, seed=0):
+    r = random.Random(seed)
+    k = len(spec["interface_inputs"])
+    return [tuple(r.randrange(4) for _ in range(k)) for _ in range(n)]
+
+
+def _selected(select, name, *metrics):
+    return not select or any(select in f"{name} [{m}]" for m in metrics)
+
+
+def _push(spec):
+    push = COMPOSITE(spec)
+
+    def run(vectors):
+        k = len(vectors[0])
+        for v in vectors:
+            push._in[:k] = v
+            push.run()
+    return run
+
+
+def _batch(spec):
+    import numpy as np
+    batch = COMPOSITE(spec)
+    return lambda vectors: batch.run_batch(np.array(vectors, dtype=np.uint8))
+
+
+def _levelized(spec):
+    sim = LevelizedSim(spec)
+    return lambda vectors: [sim.run(v) for v in vectors]
+
+
+def _event(spec):
+    sim = EventSim(spec)
+    return lambda vectors: [sim.run(v) for v in vectors]
+
+
+def _compiled(spec):
+    fn = compile_spec(spec)
+    return lambda vectors: [fn(*v) for v in vectors]
+
+
+# name -> function(spec) returning function(vectors) evaluating every vector.
+ENGINES = {
+    "push": _push,
+    "levelized": _levelized,
+    "event": _event,
+    "compiled": _compiled,
+    "batch": _batch,
+    "bitslice": lambda spec: BitSliceSim(spec).run,
+}
+
+
+# The push model re-propagates every reconvergent path, so it gets a
+# twentieth of the vectors and only the workloads below. Its recursion
+# depth grows with the longest path, which keeps the ripple chain at 256
+# gates; `scale` only multiplies the number of vectors.
+PUSH_SHARE = 20
+PUSH_WORKLOADS = ("ripple", "mux", "dag_shallow")
+
+
+WORKLOADS = {
+    "ripple": lambda: ripple_chain(256),
+    "mux": lambda: mux_tree(6),
+    "dag_shallow": lambda: reconvergent_dag(32, 6),
+    "dag": lambda: reconvergent_dag(32, 16),
+    "layered": lambda: layered(4096, depth=32),
+    "adders": lambda: adder_array(8, 4),
+}
+
+
+def bench_engines(scale, repeat, select=None):
+    results = []
+    for wname, make_spec in WORKLOADS.items():
+        engines = [
+            e for e in ENGINES
+            if (e != "push" or wname in PUSH_WORKLOADS)
+            and _selected(select, f"engine/{wname}/{e}", "vectors/s", "gates/s")
+        ]
+        if not engines:
+            continue
+        spec = make_spec()
+        gates = _gates(spec)
+        for ename in engines:
+            run = ENGINES[ename](spec)
+            if ename == "push":
+                vectors = _vectors(spec, 200 * scale // PUSH_SHARE)
+            else:
+                vectors = _vectors(spec, 200 * scale)
+            seconds = _best(lambda: run(vectors), repeat)
+            rate = len(vectors) / seconds
+            results.append((f"engine/{wname}/{ename}", "vectors/s", rate))
+            results.append((f"engine/{wname}/{ename}", "gates/s", rate * gates))
+    return results
+
+
+def bench_composite_json(scale, repeat, select=None):
+    if not _selected(select, "composite/json_load_run", "gates/s"):
+        return []
+    spec = reconvergent_dag(32 * scale, 6)
+    fd, path = tempfile.mkstemp(suffix=".json")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(spec, f)
+        vector = _vectors(spec, 1)[0]
+
+        def load_and_run():
+            c = load_composite_from_json(path)
+            c._in[:len(vector)] = vector
+            c.run()
+
+        seconds = _best(load_and_run, repeat)
+    finally:
+        os.remove(path)
+    return [("composite/json_load_run", "gates/s", _gates(spec) / seconds)]
+
+
+def _program(n, seed=0):
+    r = random.Random(seed)
+    lines = []
+    for _ in range(n):
+        op = r.choice(("LOAD", "ADD", "SUB", "MUL", "MIN", "MAX", "MOD", "COPY", "NOT"))
+        if op == "LOAD":
+            lines.append(f"LOAD R{r.randrange(4)}, {r.randrange(4)}  -- constant")
+        elif op == "NOT":
+            lines.append(f"NOT R{r.randrange(4)}")
+        else:
+            lines.append(f"{op} R{r.randrange(4)}, R{r.randrange(4)}")
+    lines.append("HLT")
+    return "\n".join(lines)
+
+
+def bench_assembler(scale, repeat, select=None):
+    cases = {
+        "asm/compile_asm": compile_asm,
+        "asm/assemble": lambda source: assemble(source.splitlines()),
+    }
+    cases = {name: fn for name, fn in cases.items() if _selected(select, name, "lines/s")}
+    if not cases:
+        return []
+    source = _program(20000 * scale)
+    lines = source.count("\n") + 1
+    return [(name, "lines/s", lines / _best(lambda: fn(source), repeat)) for name, fn in cases.items()]
+
+
+def _run_cpu(ram, var, flags):
+    cpu = txt.CPU(var, flags)
+    steps = 0
+    while flags.run(3, 3, 0, 0) == 0:
+        cpu.run(*ram.fetch())
+        steps += 1
+    return steps
+
+
+def bench_cpu(scale, repeat, select=None):
+    results = []
+    names = ("tree", "array", "paged", "functional")
+    if not any(_selected(select, f"cpu/{name}", "instructions/s") for name in names):
+        return results
+    small = assemble(_program(9, seed=1))
+    large = assemble(_program(2000 * scale, seed=1))
+
+    def tree():
+        ram = txt.RAM3()
+        ram.load_digits(small)
+        return _run_cpu(ram, txt.RG16(), txt.RG16())
+
+    def array():
+        ram = txt.RAM3Array()
+        ram.load_digits(small)
+        return _run_cpu(ram, txt.RG16Array(), txt.RG16Array())
+
+    def paged():
+        ram = txt.RAMN(txt._width(len(large)))
+        ram.load_digits(large)
+        return _run_cpu(ram, txt.RG16Array(), txt.RG16Array())
+
+    def functional():
+        isa = txt.ISA(4 ** txt._width(len(large)), paged=True)
+        isa.load_digits(large)
+        return isa.run()
+
+    for name, fn in zip(names, (tree, array, paged, functional)):
+        if not _selected(select, f"cpu/{name}", "instructions/s"):
+            continue
+        steps = fn()
+        results.append((f"cpu/{name}", "instructions/s", steps / _best(fn, repeat)))
+    return results
+
+
+BENCHMARKS = (bench_engines, bench_composite_json, bench_assembler, bench_cpu)
+
+
+def run(scale=2, repeat=3, select=None, out=sys.stdout):
+    results = {}
+    for bench in BENCHMARKS:
+        for name, metric, value in bench(scale, repeat, select):
+            key = f"{name} [{metric}]"
+            if select and select not in key:
+                continue
+            results[key] = value
+            if out:
+                out.write(f"{key:<44} {value:>16,.0f}\n")
+                out.flush()
+    return results
+
+
+def compare(results, baseline, tolerance=0.2, out=sys.stdout):
+    """Print current/baseline ratios and return the keys slower than 1 - tolerance."""
+    regressions = []
+    for key, value in results.items():
+        base = baseline.get(key)
+        if not base:
+            continue
+        ratio = value / base
+        mark = ""
+        if ratio < 1 - tolerance:
+            regressions.append(key)
+            mark = "  REGRESSION"
+        out.write(f"{key:<44} {ratio:>7.2f}x{mark}\n")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the simulators, assembler and CPU.")
+    parser.add_argument("--quick", action="store_true", help="smaller workloads")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("-k", dest="select", default=None, help="only results whose name contains this")
+    parser.add_argument("--save", metavar="FILE", help="write results as a baseline")
+    parser.add_argument("--compare", metavar="FILE", help="compare against a stored baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    results = run(1 if args.quick else 2, args.repeat, args.select)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        print()
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} regression(s) beyond {args.tolerance:.0%}")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
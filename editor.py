@@ -2,7 +2,7 @@ import pygame
 import json
 import os
 from sim import userInput
-from sim.chip import AND, OR, NOT, PRINT, SPLIT, COMPOSITE, load_composite_from_json
+from sim.chip import COMPOSITE, load_composite_from_json, chip_type
 
 class Node:
     def __init__(self, nid, t, pos):
@@ -12,33 +12,15 @@ class Node:
         self.rect = pygame.Rect(pos[0], pos[1], 120, 60)
         self.value = 0
         if t == "INPUT":
+            self.kind = None
             self.obj = userInput()
             self.inputs = []
             self.outputs = ["A"]
-        elif t == "AND":
-            self.obj = AND()
-            self.inputs = ["A", "B"]
-            self.outputs = ["A"]
-        elif t == "OR":
-            self.obj = OR()
-            self.inputs = ["A", "B"]
-            self.outputs = ["A"]
-        elif t == "NOT":
-            self.obj = NOT()
-            self.inputs = ["A"]
-            self.outputs = ["A"]
-        elif t == "PRINT":
-            self.obj = PRINT()
-            self.inputs = ["A"]
-            self.outputs = ["A"]
-        elif t == "SPLIT":
-            self.obj = SPLIT()
-            self.inputs = ["A"]
-            self.outputs = ["A"]
         else:
-            self.obj = None
-            self.inputs = []
-            self.outputs = []
+            self.kind = chip_type(t)
+            self.obj = self.kind.build({"id": nid, "type": t})
+            self.inputs = list(self.kind.inputs)
+            self.outputs = list(self.kind.outputs)
         self._ensure_rect_size()
 
     def _ensure_rect_size(self):
@@ -79,6 +61,62 @@ class Node:
                 return ("out", label)
         return None
 
+class SpatialGrid:
+    """
+    Uniform grid over the canvas: every item is filed under each cell its
+    bounding rect touches, so a point query only looks at one cell.
+    Items are any hashable key; move() refiles one after it changed.
+    """
+
+    def __init__(self, cell=128):
+        self.cell = cell
+        self.cells = {}
+        self.rects = {}
+
+    def _span(self, rect):
+        x, y, w, h = rect
+        c = self.cell
+        return [(cx, cy)
+                for cx in range(int(x) // c, int(x + w) // c + 1)
+                for cy in range(int(y) // c, int(y + h) // c + 1)]
+
+    def insert(self, key, rect):
+        rect = tuple(rect)
+        self.rects[key] = rect
+        for cell in self._span(rect):
+            self.cells.setdefault(cell, set()).add(key)
+
+    def remove(self, key):
+        rect = self.rects.pop(key, None)
+        if rect is None:
+            return
+        for cell in self._span(rect):
+            bucket = self.cells.get(cell)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self.cells[cell]
+
+    def move(self, key, rect):
+        if self.rects.get(key) == tuple(rect):
+            return
+        self.remove(key)
+        self.insert(key, rect)
+
+    def clear(self):
+        self.cells = {}
+        self.rects = {}
+
+    def query(self, pos):
+        return self.cells.get((int(pos[0]) // self.cell, int(pos[1]) // self.cell), ())
+
+    def query_rect(self, rect):
+        found = set()
+        for cell in self._span(rect):
+            found.update(self.cells.get(cell, ()))
+        return found
+
+
 class Editor:
     def __init__(self):
         pygame.init()
@@ -97,71 +135,233 @@ class Editor:
         self.selected_node = None
         self.font = pygame.font.SysFont(None, 18)
         self.running = True
+        # Lookup structures kept in step with nodes/connections: id -> node,
+        # id(chip object) -> node, node id -> attached connections,
+        # id(connection) -> connection, and grids of node rects and wire
+        # bounding boxes.
+        self._by_id = {}
+        self._by_obj = {}
+        self._z = {}
+        self._wires_at = {}
+        self._wires = {}
+        self.node_grid = SpatialGrid()
+        self.wire_grid = SpatialGrid()
+        # Rendering: cached text surfaces, one cached surface per node
+        # (re-rendered when what it shows changes) and the screen areas
+        # that need repainting on the next frame.
+        self._glyphs = {}
+        self._node_cache = {}
+        self._dirty = []
+        # Simulation: topological order of the gates (None while stale, False
+        # for a circuit with a loop), fan-out cone per INPUT node, and how
+        # many gates the last input change or run re-evaluated.
+        self._order = None
+        self._succ = {}
+        self._cones = {}
+        self.touched = None
+
+    def _add_node(self, n):
+        self._z[n] = len(self.nodes)
+        self.nodes.append(n)
+        self._by_id[n.id] = n
+        self._by_obj[id(n.obj)] = n
+        self.node_grid.insert(n, n.rect)
+        self._dirty.append(self._node_area(n.rect))
+        self._order = None
 
     def add_node(self, t, pos):
         nid = str(len(self.nodes))
-        n = Node(nid, t, pos)
-        self.nodes.append(n)
+        while nid in self._by_id:
+            nid = str(int(nid) + 1)
+        self._add_node(Node(nid, t, pos))
 
     def node_at(self, pos):
-        for n in reversed(self.nodes):
-            if n.rect.collidepoint(pos):
-                return n
-        return None
+        hits = [n for n in self.node_grid.query(pos) if n.rect.collidepoint(pos)]
+        if not hits:
+            return None
+        return max(hits, key=self._z.__getitem__)
+
+    def moved(self, n):
+        """Refile a node and its wires after its rect changed, repainting both places."""
+        old = self.node_grid.rects.get(n)
+        if old is not None:
+            self._dirty.append(self._node_area(old))
+        self.node_grid.move(n, n.rect)
+        self._dirty.append(self._node_area(n.rect))
+        for c in self._wires_at.get(n.id, ()):
+            self._mark_wire(c)
+            self._index_wire(c)
+            self._mark_wire(c)
+
+    @staticmethod
+    def _node_area(rect):
+        # Pins stick out 6 px past the node's sides.
+        return pygame.Rect(rect).inflate(14, 14)
+
+    def _mark_wire(self, c):
+        rect = self.wire_grid.rects.get(id(c))
+        if rect is not None:
+            self._dirty.append(pygame.Rect(rect))
+
+    def mark_node(self, n):
+        self._dirty.append(self._node_area(n.rect))
+
+    def mark_all(self):
+        self._dirty.append(self.screen.get_rect())
+
+    def select_connection(self, c):
+        if self.selected_connection is not None:
+            self._mark_wire(self.selected_connection)
+        self.selected_connection = c
+        if c is not None:
+            self._mark_wire(c)
+
+    def _wire_points(self, c):
+        a = self._by_id[c["src_id"]]
+        b = self._by_id[c["dst_id"]]
+        ai = a.outputs.index(c["src_label"])
+        bi = b.inputs.index(c["dst_label"])
+        return (a.rect.right, a.rect.top + 15 + ai * 20), (b.rect.left, b.rect.top + 15 + bi * 20)
+
+    def _index_wire(self, c):
+        (ax, ay), (bx, by) = self._wire_points(c)
+        x, y = min(ax, bx) - 6, min(ay, by) - 6
+        self.wire_grid.move(id(c), (x, y, abs(bx - ax) + 12, abs(by - ay) + 12))
+
+    def _add_connection(self, c):
+        self.connections.append(c)
+        self._wires[id(c)] = c
+        self._wires_at.setdefault(c["src_id"], []).append(c)
+        if c["dst_id"] != c["src_id"]:
+            self._wires_at.setdefault(c["dst_id"], []).append(c)
+        self._index_wire(c)
+        self._mark_wire(c)
+        self._order = None
+
+    def _remove_connection(self, c):
+        self._mark_wire(c)
+        self._order = None
+        self.connections = [x for x in self.connections if x is not c]
+        del self._wires[id(c)]
+        self.wire_grid.remove(id(c))
+        for nid in (c["src_id"], c["dst_id"]):
+            attached = self._wires_at.get(nid)
+            if attached:
+                self._wires_at[nid] = [x for x in attached if x is not c]
 
     def connect(self, src, src_label, dst, dst_label):
         if src.type == "INPUT":
             src.obj.connectTo(dst.obj, dst_label)
-            self.connections.append({"src_id": src.id, "src_label": "A", "dst_id": dst.id, "dst_label": dst_label})
+            self._add_connection({"src_id": src.id, "src_label": "A", "dst_id": dst.id, "dst_label": dst_label})
         else:
             src.obj.addConnection(dst.obj, dst_label, src_label)
-            self.connections.append({"src_id": src.id, "src_label": src_label, "dst_id": dst.id, "dst_label": dst_label})
+            self._add_connection({"src_id": src.id, "src_label": src_label, "dst_id": dst.id, "dst_label": dst_label})
 
-    def draw_node(self, n):
-        pygame.draw.rect(self.screen, (40, 40, 50), n.rect, border_radius=6)
-        pygame.draw.rect(self.screen, (200, 200, 220), n.rect, 1, border_radius=6)
-        t = self.font.render(n.type, True, (240, 240, 240))
-        self.screen.blit(t, (n.rect.centerx - t.get_width() // 2, n.rect.top + 2))
+    def _text(self, text, color):
+        key = (text, color)
+        surf = self._glyphs.get(key)
+        if surf is None:
+            surf = self._glyphs[key] = self.font.render(text, True, color)
+        return surf
+
+    def _node_key(self, n):
+        shown = None
+        if n.type == "INPUT":
+            shown = n.value
+        elif n.type == "PRINT" and n.obj:
+            shown = n.obj.outputs.get("A")
+        return n.type, n.rect.size, tuple(n.inputs), tuple(n.outputs), shown
+
+    def _render_node(self, n, key):
+        area = self._node_area(n.rect)
+        surf = pygame.Surface(area.size, pygame.SRCALPHA)
+        r = n.rect.move(-area.x, -area.y)
+        pygame.draw.rect(surf, (40, 40, 50), r, border_radius=6)
+        pygame.draw.rect(surf, (200, 200, 220), r, 1, border_radius=6)
+        t = self._text(n.type, (240, 240, 240))
+        surf.blit(t, (r.centerx - t.get_width() // 2, r.top + 2))
         for i, label in enumerate(n.inputs):
-            cx = n.rect.left
-            cy = n.rect.top + 15 + i * 20
-            pygame.draw.circle(self.screen, (100, 180, 240), (cx, cy), 6)
-            l = self.font.render(label, True, (240, 240, 240))
-            self.screen.blit(l, (cx + 8, cy - 8))
+            cx = r.left
+            cy = r.top + 15 + i * 20
+            pygame.draw.circle(surf, (100, 180, 240), (cx, cy), 6)
+            l = self._text(label, (240, 240, 240))
+            surf.blit(l, (cx + 8, cy - 8))
         for i, label in enumerate(n.outputs):
-            cx = n.rect.right
-            cy = n.rect.top + 15 + i * 20
-            pygame.draw.circle(self.screen, (240, 180, 100), (cx, cy), 6)
-            l = self.font.render(label, True, (240, 240, 240))
-            self.screen.blit(l, (cx - 8 - l.get_width(), cy - 8))
+            cx = r.right
+            cy = r.top + 15 + i * 20
+            pygame.draw.circle(surf, (240, 180, 100), (cx, cy), 6)
+            l = self._text(label, (240, 240, 240))
+            surf.blit(l, (cx - 8 - l.get_width(), cy - 8))
+        shown = key[-1]
         if n.type == "INPUT":
-            v = self.font.render(str(n.value), True, (180, 255, 180))
-            self.screen.blit(v, (n.rect.centerx - v.get_width() // 2, n.rect.bottom - 20))
-        if n.type == "PRINT":
-            val = n.obj.outputs.get("A") if n.obj else None
-            if val is not None:
-                v = self.font.render(str(val), True, (255, 230, 160))
-                self.screen.blit(v, (n.rect.centerx - v.get_width() // 2, n.rect.bottom - 20))
+            v = self._text(str(shown), (180, 255, 180))
+            surf.blit(v, (r.centerx - v.get_width() // 2, r.bottom - 20))
+        if n.type == "PRINT" and shown is not None:
+            v = self._text(str(shown), (255, 230, 160))
+            surf.blit(v, (r.centerx - v.get_width() // 2, r.bottom - 20))
         if n.type == "SPLIT":
-            br = n.add_button_rect()
-            pygame.draw.rect(self.screen, (60, 160, 80), br, border_radius=3)
-            pygame.draw.rect(self.screen, (20, 40, 20), br, 1, border_radius=3)
-            plus_h = self.font.render("+", True, (250, 255, 250))
-            self.screen.blit(plus_h, (br.centerx - plus_h.get_width() // 2, br.centery - plus_h.get_height() // 2))
-
-    def draw_connections(self):
-        for idx, c in enumerate(self.connections):
-            a = self._node_by_id(c["src_id"])
-            b = self._node_by_id(c["dst_id"])
-            ai = a.outputs.index(c["src_label"])
-            bi = b.inputs.index(c["dst_label"])
-            ax = a.rect.right
-            ay = a.rect.top + 15 + ai * 20
-            bx = b.rect.left
-            by = b.rect.top + 15 + bi * 20
-            color = (255, 220, 120) if self.selected_connection == idx else (160, 160, 160)
-            width = 3 if self.selected_connection == idx else 2
-            pygame.draw.line(self.screen, color, (ax, ay), (bx, by), width)
+            br = n.add_button_rect().move(-area.x, -area.y)
+            pygame.draw.rect(surf, (60, 160, 80), br, border_radius=3)
+            pygame.draw.rect(surf, (20, 40, 20), br, 1, border_radius=3)
+            plus_h = self._text("+", (250, 255, 250))
+            surf.blit(plus_h, (br.centerx - plus_h.get_width() // 2, br.centery - plus_h.get_height() // 2))
+        return surf
+
+    def draw_node(self, n):
+        key = self._node_key(n)
+        cached = self._node_cache.get(n)
+        if cached is None or cached[0] != key:
+            cached = self._node_cache[n] = (key, self._render_node(n, key))
+        area = self._node_area(n.rect)
+        self.screen.blit(cached[1], area.topleft)
+
+    def draw_connections(self, area=None):
+        """Draw the wires (those touching `area` if given) and return their bounds."""
+        if area is None:
+            wires = self.connections
+        else:
+            wires = [self._wires[k] for k in self.wire_grid.query_rect(area)]
+        # The selected wire always goes on top, even where a redrawn wire crosses it outside `area`.
+        wires = [c for c in wires if c is not self.selected_connection]
+        if self.selected_connection is not None:
+            wires.append(self.selected_connection)
+        drawn = []
+        for c in wires:
+            a, b = self._wire_points(c)
+            selected = self.selected_connection is c
+            color = (255, 220, 120) if selected else (160, 160, 160)
+            width = 3 if selected else 2
+            drawn.append(pygame.draw.line(self.screen, color, a, b, width))
+        return drawn
+
+    def redraw(self):
+        """
+        Repaint the union of this frame's dirty areas: background and nodes
+        clipped to it, then every wire touching it drawn whole (wires sit on
+        top of nodes, so redrawing their full length leaves the frame exactly
+        as a full repaint would; a clipped line rasterizes differently).
+        Nodes and wires away from the area are skipped.
+        """
+        if not self._dirty:
+            return
+        area = self._dirty[0].unionall(self._dirty[1:]).clip(self.screen.get_rect())
+        self._dirty = []
+        if not area.w or not area.h:
+            return
+        self.screen.set_clip(area)
+        self.screen.fill((20, 22, 25))
+        nodes = [n for n in self.node_grid.query_rect(area.inflate(14, 14))
+                 if self._node_area(n.rect).colliderect(area)]
+        for n in sorted(nodes, key=self._z.__getitem__):
+            self.draw_node(n)
+        self.screen.set_clip(None)
+        shown = area.unionall(self.draw_connections(area))
+        if self.menu_open:
+            self.draw_menu()
+            shown.union_ip(self._menu_rect())
+        self.draw_help()
+        shown.union_ip(self._help_rect())
+        pygame.display.update(shown.clip(self.screen.get_rect()))
 
     def _dist_to_segment(self, p, a, b):
         (px, py), (ax, ay), (bx, by) = p, a, b
@@ -175,31 +375,27 @@ class Editor:
 
     def hit_connection(self, pos):
         best = (None, 99999)
-        for idx, c in enumerate(self.connections):
-            a = self._node_by_id(c["src_id"])
-            b = self._node_by_id(c["dst_id"])
-            ai = a.outputs.index(c["src_label"])
-            bi = b.inputs.index(c["dst_label"])
-            ax = a.rect.right
-            ay = a.rect.top + 15 + ai * 20
-            bx = b.rect.left
-            by = b.rect.top + 15 + bi * 20
-            d = self._dist_to_segment(pos, (ax, ay), (bx, by))
+        for key in self.wire_grid.query(pos):
+            c = self._wires[key]
+            d = self._dist_to_segment(pos, *self._wire_points(c))
             if d < best[1]:
-                best = (idx, d)
+                best = (c, d)
         if best[0] is not None and best[1] <= 6:
             return best[0]
         return None
 
     def _node_by_id(self, nid):
-        for n in self.nodes:
-            if n.id == nid:
-                return n
-        return None
+        return self._by_id.get(nid)
+
+    def _menu_rect(self):
+        return pygame.Rect(self.menu_pos[0], self.menu_pos[1], 120, 22 * 6)
 
     def open_menu(self, pos):
+        if self.menu_open:
+            self._dirty.append(self._menu_rect())
         self.menu_open = True
         self.menu_pos = pos
+        self._dirty.append(self._menu_rect())
 
     def draw_menu(self):
         if not self.menu_open:
@@ -212,12 +408,13 @@ class Editor:
         pygame.draw.rect(self.screen, (30, 30, 32), r)
         pygame.draw.rect(self.screen, (200, 200, 220), r, 1)
         for i, it in enumerate(items):
-            t = self.font.render(it, True, (240, 240, 240))
+            t = self._text(it, (240, 240, 240))
             self.screen.blit(t, (x + 6, y + 4 + i * 22))
 
     def click_menu(self, pos):
         items = ["INPUT", "AND", "OR", "NOT", "PRINT", "SPLIT"]
         x, y = self.menu_pos
+        self._dirty.append(self._menu_rect())
         for i, it in enumerate(items):
             r = pygame.Rect(x, y + i * 22, 120, 22)
             if r.collidepoint(pos):
@@ -245,6 +442,18 @@ class Editor:
             data = json.load(f)
         self.nodes = []
         self.connections = []
+        self._by_id = {}
+        self._by_obj = {}
+        self._z = {}
+        self._wires_at = {}
+        self._wires = {}
+        self.node_grid.clear()
+        self.wire_grid.clear()
+        self._node_cache = {}
+        self._order = None
+        self.selected_node = None
+        self.selected_connection = None
+        self.mark_all()
         for n in data.get("nodes", []):
             node = Node(n["id"], n["type"], tuple(n["pos"]))
             node.value = n.get("value", 0)
@@ -257,7 +466,7 @@ class Editor:
                     except Exception:
                         pass
             node._ensure_rect_size()
-            self.nodes.append(node)
+            self._add_node(node)
         for c in data.get("connections", []):
             a = self._node_by_id(c["src_id"])
             b = self._node_by_id(c["dst_id"])
@@ -265,9 +474,9 @@ class Editor:
                 a.obj.connectTo(b.obj, c["dst_label"])
             else:
                 a.obj.addConnection(b.obj, c["dst_label"], c["src_label"])
-            self.connections.append(c)
+            self._add_connection(c)
 
-    def compile(self, path):
+    def to_spec(self):
         interface_inputs = []
         used_inputs = set()
         for c in self.connections:
@@ -305,19 +514,125 @@ class Editor:
             "interface_inputs": interface_inputs,
             "interface_outputs": interface_outputs
         }
+        return spec
+
+    def compile(self, path):
+        spec = self.to_spec()
         d = os.path.dirname(path)
         if d and not os.path.exists(d):
             os.makedirs(d)
         with open(path, "w", encoding="utf-8") as f:
             json.dump(spec, f)
 
+    def _successors(self):
+        succ = {n: [] for n in self.nodes}
+        for c in self.connections:
+            a = self._by_id[c["src_id"]]
+            if a.type != "INPUT":
+                succ[a].append(self._by_id[c["dst_id"]])
+        return succ
+
+    def _sim_order(self):
+        """Gates in topological order (Kahn), or False if the wiring has a loop."""
+        if self._order is None:
+            self._cones = {}
+            succ = self._successors()
+            indeg = {n: 0 for n in self.nodes}
+            for n, nxt in succ.items():
+                for m in nxt:
+                    indeg[m] += 1
+            ready = [n for n in self.nodes if indeg[n] == 0]
+            order = []
+            while ready:
+                n = ready.pop()
+                order.append(n)
+                for m in succ[n]:
+                    indeg[m] -= 1
+                    if indeg[m] == 0:
+                        ready.append(m)
+            self._succ = succ
+            self._order = order if len(order) == len(self.nodes) else False
+        return self._order
+
+    def _cone(self, n):
+        """The gates reachable from INPUT node `n`, in topological order."""
+        order = self._sim_order()
+        if not order:
+            return None
+        cone = self._cones.get(n)
+        if cone is None:
+            start = self._by_obj.get(id(n.obj.chip))
+            reach = set()
+            stack = [start] if start is not None else []
+            while stack:
+                m = stack.pop()
+                if m not in reach:
+                    reach.add(m)
+                    stack.extend(self._succ[m])
+            cone = self._cones[n] = [m for m in order if m in reach]
+        return cone
+
+    def _evaluate(self, gates):
+        # One pass in topological order: compute each gate from its input
+        # slots and hand the value to its fanout without triggering the
+        # recursive push, so every gate runs at most once.
+        for n in gates:
+            kernel = n.kind.kernel
+            if kernel is None:
+                continue
+            obj = n.obj
+            args = obj._in[:len(n.kind.inputs)]
+            if None in args:
+                continue
+            v = kernel(*args)
+            out = obj._out
+            for port, fan in enumerate(obj._fanout):
+                out[port] = v
+                for i in range(0, len(fan), 2):
+                    fan[i]._in[fan[i + 1]] = v
+        self.touched = len(gates)
+        self._dirty.append(self._help_rect())
+
+    def set_input(self, n, value):
+        """Drive INPUT node `n` and re-evaluate only its fan-out cone."""
+        n.value = value
+        self.mark_node(n)
+        if n.obj.chip is None:
+            return
+        cone = self._cone(n)
+        if cone is None:
+            n.obj.run(value)
+        else:
+            if value > 3 or value < 0:
+                raise ValueError("This system can not exceed values over 3 or lower than 0")
+            n.obj.chip._in[n.obj._slot] = value
+            self._evaluate(cone)
+        self.mark_prints()
+
     def run_sim(self):
-        for n in self.nodes:
-            if n.type == "INPUT":
+        inputs = [n for n in self.nodes if n.type == "INPUT" and n.obj.chip is not None]
+        if self._sim_order() is False:
+            for n in inputs:
                 try:
                     n.obj.run(n.value)
                 except Exception:
                     pass
+        else:
+            gates = set()
+            for n in inputs:
+                n.obj.chip._in[n.obj._slot] = n.value
+                gates.update(self._cone(n))
+            self._evaluate([m for m in self._order if m in gates])
+        self.mark_prints()
+
+    def mark_prints(self):
+        # A run can change any PRINT's value; their cached surfaces notice.
+        for n in self.nodes:
+            if n.type == "PRINT":
+                self.mark_node(n)
+
+    def _help_rect(self):
+        return pygame.Rect(0, self.h - 26, self.w, 26)
 
     def draw_help(self):
         bar_h = 26
@@ -325,12 +640,18 @@ class Editor:
         pygame.draw.rect(self.screen, (28, 30, 34), r)
         pygame.draw.line(self.screen, (50, 52, 58), (0, self.h - bar_h), (self.w, self.h - bar_h), 1)
         text = "Right-click: Add  |  Left-click OUT then IN: Connect  |  Drag: Move  |  Keys: 0–3 INPUT, R Run, S Save, L Load, C Compile"
-        t = self.font.render(text, True, (220, 220, 230))
+        t = self._text(text, (220, 220, 230))
         self.screen.blit(t, (8, self.h - bar_h + (bar_h - t.get_height()) // 2))
+        if self.touched is not None:
+            t = self._text(f"{self.touched} gates evaluated", (180, 255, 180))
+            self.screen.blit(t, (self.w - 8 - t.get_width(), self.h - bar_h + (bar_h - t.get_height()) // 2))
 
     def loop(self):
+        self.mark_all()
+        self.redraw()
         while self.running:
-            for event in pygame.event.get():
+            # Nothing is animated, so sleep until the next event.
+            for event in [pygame.event.wait()] + pygame.event.get():
                 if event.type == pygame.QUIT:
                     self.running = False
                 elif event.type == pygame.MOUSEBUTTONDOWN:
@@ -342,7 +663,7 @@ class Editor:
                                 continue
                         hit = self.hit_connection(event.pos)
                         if hit is not None:
-                            self.selected_connection = hit
+                            self.select_connection(hit)
                             self.selected_node = None
                             self.selected_pin = None
                             continue
@@ -365,6 +686,7 @@ class Editor:
                             else:
                                 if n.type == "SPLIT" and n.add_button_rect().collidepoint(event.pos):
                                     n.add_output()
+                                    self.moved(n)
                                 else:
                                     self.selected_node = n
                                     self.dragging = True
@@ -372,7 +694,7 @@ class Editor:
                         else:
                             self.selected_node = None
                             self.selected_pin = None
-                            self.selected_connection = None
+                            self.select_connection(None)
                 elif event.type == pygame.MOUSEBUTTONUP:
                     if event.button == 1:
                         self.dragging = False
@@ -381,6 +703,7 @@ class Editor:
                         self.selected_node.rect.x = event.pos[0] - self.drag_offset[0]
                         self.selected_node.rect.y = event.pos[1] - self.drag_offset[1]
                         self.selected_node.pos = (self.selected_node.rect.x, self.selected_node.rect.y)
+                        self.moved(self.selected_node)
                 elif event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_s:
                         self.save(os.path.join("circuits", "circuit.json"))
@@ -392,29 +715,22 @@ class Editor:
                         self.run_sim()
                     elif event.key in (pygame.K_DELETE, pygame.K_BACKSPACE):
                         if self.selected_connection is not None:
-                            c = self.connections[self.selected_connection]
+                            c = self.selected_connection
                             src = self._node_by_id(c["src_id"])
                             dst = self._node_by_id(c["dst_id"])
                             if src.type == "INPUT":
                                 src.obj.disconnect()
                             else:
                                 src.obj.removeConnection(dst.obj, c["dst_label"], c["src_label"])
-                            del self.connections[self.selected_connection]
-                            self.selected_connection = None
+                            self._remove_connection(c)
+                            self.select_connection(None)
                     elif event.unicode in ["0", "1", "2", "3"]:
                         if self.selected_node and self.selected_node.type == "INPUT":
-                            self.selected_node.value = int(event.unicode)
                             try:
-                                self.selected_node.obj.run(self.selected_node.value)
+                                self.set_input(self.selected_node, int(event.unicode))
                             except Exception:
                                 pass
-            self.screen.fill((20, 22, 25))
-            for n in self.nodes:
-                self.draw_node(n)
-            self.draw_connections()
-            self.draw_menu()
-            self.draw_help()
-            pygame.display.flip()
+            self.redraw()
             self.clock.tick(60)
 
 def main():
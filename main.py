@@ -1,8 +1,15 @@
-from editor import main
+import sys
 
 
 def run():
-    main()
+    # "python main.py run spec.json ..." streams vectors headless; anything
+    # else opens the editor, the only path that needs pygame.
+    if sys.argv[1:2] == ["run"]:
+        from sim.stream import main
+        main(sys.argv[2:])
+    else:
+        from editor import main
+        main()
 
 
 if __name__ == "__main__":
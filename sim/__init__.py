@@ -3,3 +3,10 @@ from sim.core import Chip
 
 from sim.utility import from2bites
 from sim.utility import to2bites
+
+from sim.netlist import Netlist
+from sim.levelized import LevelizedSim
+from sim.event import EventSim
+from sim.bitslice import BitSliceSim
+from sim.cycle import CycleSim
+from sim.profiler import Profiler
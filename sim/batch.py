@@ -0,0 +1,83 @@
+import numpy as np
+
+from sim.netlist import Netlist
+
+
+UNSET = 255
+
+BATCH_KERNELS = {
+    "AND": np.minimum,
+    "OR": np.maximum,
+    "NOT": lambda _in: 3 - _in,
+    "PRINT": lambda _in: _in,
+    "SPLIT": lambda _in: _in,
+}
+
+
+class BatchSim:
+    """
+    Evaluates a netlist over many input vectors at once, one vectorized
+    numpy call per gate. Inputs are an (N, k) array of digits 0..3, the
+    result is an (N, m) uint8 array. Outputs that are never driven (a gate
+    upstream has an unconnected pin) read as UNSET. PRINT passes its value
+    through without printing.
+    """
+
+    def __init__(self, netlist, chunk=1 << 16):
+        if not isinstance(netlist, Netlist):
+            netlist = Netlist.from_spec(netlist)
+        self.netlist = netlist
+        self.chunk = chunk
+
+        driven = [False] * netlist.n_wires
+        for i in range(netlist.n_inputs):
+            driven[i] = True
+        plan = []
+        for g in netlist.order():
+            fanin = netlist.fanin[g]
+            if not all(w is not None and driven[w] for w in fanin):
+                continue
+            for o in netlist.fanout[g]:
+                driven[o] = True
+            t = netlist.types[g]
+            kernel = netlist.chip_types[g].kernels.get("batch") or BATCH_KERNELS.get(t)
+            if kernel is None:
+                raise ValueError(f"No batch kernel for chip type: {t}")
+            plan.append((kernel, fanin, netlist.fanout[g]))
+
+        # Drop each wire's array after its last reader so memory stays
+        # proportional to the widest level, not to the whole netlist.
+        last_use = {}
+        for step, (_, fanin, _) in enumerate(plan):
+            for w in fanin:
+                last_use[w] = step
+        outputs = set(netlist.outputs)
+        self._release = [[] for _ in plan]
+        for w, step in last_use.items():
+            if w not in outputs:
+                self._release[step].append(w)
+        self._plan = plan
+        self._driven = driven
+
+    def run(self, inputs):
+        net = self.netlist
+        inputs = np.asarray(inputs, dtype=np.uint8)
+        if inputs.ndim != 2 or inputs.shape[1] != net.n_inputs:
+            raise ValueError(f"Expected an (N, {net.n_inputs}) input array, got shape {inputs.shape}")
+        if inputs.size and inputs.max() > 3:
+            raise ValueError("This system can not exceed values over 3 or lower than 0")
+
+        out = np.full((inputs.shape[0], len(net.outputs)), UNSET, dtype=np.uint8)
+        for lo in range(0, inputs.shape[0], self.chunk):
+            block = inputs[lo:lo + self.chunk]
+            wires = {i: block[:, i] for i in range(net.n_inputs)}
+            for (kernel, fanin, fanout), release in zip(self._plan, self._release):
+                v = kernel(*[wires[w] for w in fanin])
+                for o in fanout:
+                    wires[o] = v
+                for w in release:
+                    del wires[w]
+            for j, w in enumerate(net.outputs):
+                if self._driven[w]:
+                    out[lo:lo + self.chunk, j] = wires[w]
+        return out
@@ -2,11 +2,16 @@ from sim.core import Chip
 
 
 class AND(Chip):
+    __slots__ = ()
+    IN_LABELS = ("A", "B")
+    OUT_LABELS = ("A",)
+
     def run(self):
-        if len(self.inputs) != 2:
+        a, b = self._in[0], self._in[1]
+        if a is None or b is None:
             return
 
-        self.outputs["A"] = self._and(self.inputs["A"], self.inputs["B"])
+        self._out[0] = self._and(a, b)
 
         super().run()
 
@@ -1,49 +1,245 @@
 from sim.core import Chip
-from sim.chip import AND, OR, NOT, PRINT, SPLIT
+from sim.chip.registry import build_chip, chip_type
+from collections import OrderedDict
+import itertools
 import json
+import os
+
+MEMO_MAX_INPUTS = 8
+
 
 class COMPOSITE(Chip):
-    def __init__(self, spec):
+    """
+    `memo` caches interface outputs per input vector: "lazy" fills the
+    table on first use, "eager" builds all 4^k rows up front. Chips with
+    more than MEMO_MAX_INPUTS inputs get an LRU cache of `memo_size`
+    vectors instead. Memoized runs skip PRINT side effects. run() pushes
+    the outputs on like any other chip, so a memoized composite can be
+    wired into a push network as a sub-chip.
+
+    engine="compiled" builds no chip objects and evaluates through the
+    generated function of compiled(), made on first use.
+    """
+
+    def __init__(self, spec, engine="push", base_dir=None, library=None, memo=None, memo_size=4096):
         super().__init__()
+        if any(n["type"] == "COMPOSITE" for n in spec.get("nodes", [])):
+            spec = flatten_spec(spec, base_dir, library)
+        self.spec = spec
+        self.engine = engine
         self._nodes = {}
         self._inputs_map = []
         self._outputs_map = []
+        self._regs = []
+        self._sim = None
+        self._batch = None
+        self._fn = None
+        self._n_inputs = len(spec.get("interface_inputs", []))
+        n_outputs = len(spec.get("interface_outputs", []))
+        for i in range(self._n_inputs):
+            self.input_slot(str(i))
+        for i in range(n_outputs):
+            self.output_slot(str(i))
+        if engine == "levelized":
+            from sim.levelized import LevelizedSim
+            self._sim = LevelizedSim(spec)
+        elif engine == "event":
+            from sim.event import EventSim
+            self._sim = EventSim(spec)
+        elif engine == "cycle":
+            from sim.cycle import CycleSim
+            self._sim = CycleSim(spec)
+        elif engine == "push":
+            self._build_nodes(spec)
+        elif engine == "compiled":
+            pass
+        else:
+            raise ValueError(f"Unknown engine: {engine}")
+
+        self.memo = memo
+        self.memo_size = memo_size
+        self.memo_hits = 0
+        self.memo_misses = 0
+        self._table = None
+        self._lru = None
+        if memo is None:
+            pass
+        elif any(chip_type(n["type"]).sequential for n in spec.get("nodes", [])):
+            raise ValueError("Can not memoize a composite with registers")
+        elif memo not in ("lazy", "eager"):
+            raise ValueError(f"Unknown memo mode: {memo}")
+        elif self._n_inputs <= MEMO_MAX_INPUTS:
+            self._table = [None] * (4 ** self._n_inputs)
+            if memo == "eager":
+                self._build_table()
+        elif memo == "eager":
+            raise ValueError(f"Cannot build a full truth table for {self._n_inputs} inputs")
+        else:
+            self._lru = OrderedDict()
+
+    def _build_nodes(self, spec):
+        nodes = self._nodes
         for n in spec.get("nodes", []):
-            t = n["type"]
-            if t == "AND":
-                obj = AND()
-            elif t == "OR":
-                obj = OR()
-            elif t == "NOT":
-                obj = NOT()
-            elif t == "PRINT":
-                obj = PRINT()
-            elif t == "SPLIT":
-                obj = SPLIT()
-                outs = n.get("outputs", ["A"])
-                for lbl in outs[1:]:
-                    obj.add_output(lbl)
-            else:
-                obj = None
-            self._nodes[n["id"]] = obj
+            obj = nodes[n["id"]] = build_chip(n)
+            if chip_type(n["type"]).sequential:
+                self._regs.append(obj)
         for c in spec.get("connections", []):
             a = self._nodes[c["src_id"]]
             b = self._nodes[c["dst_id"]]
             a.addConnection(b, c["dst_label"], c["src_label"])
         for m in spec.get("interface_inputs", []):
-            self._inputs_map.append((m["chip_id"], m["label"]))
+            obj = self._nodes[m["chip_id"]]
+            self._inputs_map.append((obj, obj.input_slot(m["label"])))
         for m in spec.get("interface_outputs", []):
-            self._outputs_map.append((m["chip_id"], m["label"], m["out_label"]))
+            obj = self._nodes[m["chip_id"]]
+            self._outputs_map.append((obj, obj.output_slot(m["out_label"])))
 
-    def run(self):
-        for i, (chip_id, label) in enumerate(self._inputs_map):
-            self._nodes[chip_id].inputs[label] = self.inputs.get(str(i), None)
+    def _build_table(self):
+        for idx, values in enumerate(itertools.product(range(4), repeat=self._n_inputs)):
+            self._table[idx] = tuple(self._evaluate(values))
+
+    def _evaluate(self, values):
+        if self._sim is not None:
+            return self._sim.run(values)
+        if self.engine == "compiled":
+            return list(self.compiled()(*values))
+        for (obj, slot), v in zip(self._inputs_map, values):
+            obj._in[slot] = v
+        # One clock cycle: registers drive their stored values, the logic
+        # settles, outputs are sampled, then every register loads.
+        for reg in self._regs:
+            reg.present()
         for node in self._nodes.values():
             node.run()
-        for i, (chip_id, label, out_label) in enumerate(self._outputs_map):
-            self.outputs[str(i)] = self._nodes[chip_id].outputs.get(out_label, None)
+        outs = [obj._out[slot] for obj, slot in self._outputs_map]
+        for reg in self._regs:
+            reg.clock()
+        return outs
+
+    def _lookup(self, values):
+        if self._table is not None:
+            idx = 0
+            for v in values:
+                idx = idx * 4 + v
+            outs = self._table[idx]
+            if outs is None:
+                self.memo_misses += 1
+                outs = self._table[idx] = tuple(self._evaluate(values))
+            else:
+                self.memo_hits += 1
+            return outs
+
+        outs = self._lru.get(values)
+        if outs is None:
+            self.memo_misses += 1
+            outs = self._lru[values] = tuple(self._evaluate(values))
+            if len(self._lru) > self.memo_size:
+                self._lru.popitem(last=False)
+        else:
+            self.memo_hits += 1
+            self._lru.move_to_end(values)
+        return outs
+
+    def compiled(self):
+        if self._fn is None:
+            from sim.codegen import compile_spec
+            self._fn = compile_spec(self.spec)
+        return self._fn
+
+    def run_batch(self, inputs):
+        if self._batch is None:
+            from sim.batch import BatchSim
+            self._batch = BatchSim(self.spec)
+        return self._batch.run(inputs)
+
+    def run(self):
+        values = tuple(self._in[:self._n_inputs])
+        if self.memo is not None and None not in values:
+            outs = self._lookup(values)
+        else:
+            outs = self._evaluate(values)
+        self._out[:len(outs)] = outs
+
+        super().run()
+
+
+def _resolve_ref(node, base_dir, library):
+    if "spec" in node:
+        return node["spec"], base_dir, None
+    ref = node["ref"]
+    if library and ref in library:
+        return library[ref], base_dir, ref
+    path = ref if ref.endswith(".json") else ref + ".json"
+    if not os.path.isabs(path):
+        path = os.path.join(base_dir or ".", path)
+    path = os.path.abspath(path)
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f), os.path.dirname(path), path
+
+
+def flatten_spec(spec, base_dir=None, library=None, _stack=()):
+    """
+    Inline every COMPOSITE node of `spec` into one primitive netlist.
+
+    A nested node is {"id": ..., "type": "COMPOSITE", "ref": name_or_path}
+    (or carries its spec inline under "spec"). Names are looked up in
+    `library` first, then as <name>.json next to the parent file. Its
+    ports are the child's interface indices as strings, the same labels
+    COMPOSITE.run uses. Inner ids become "<parent id>/<child id>".
+    """
+    nodes = []
+    connections = []
+    in_pins = {}
+    out_wires = {}
+
+    for n in spec.get("nodes", []):
+        if n["type"] != "COMPOSITE":
+            nodes.append(n)
+            continue
+        child, child_dir, key = _resolve_ref(n, base_dir, library)
+        if key is not None and key in _stack:
+            raise ValueError(f"Composite {key} includes itself")
+        child = flatten_spec(child, child_dir, library, _stack + (key,) if key else _stack)
+        prefix = n["id"] + "/"
+        for c in child.get("nodes", []):
+            nodes.append(dict(c, id=prefix + c["id"]))
+        for c in child.get("connections", []):
+            connections.append(dict(c, src_id=prefix + c["src_id"], dst_id=prefix + c["dst_id"]))
+        in_pins[n["id"]] = [(prefix + m["chip_id"], m["label"]) for m in child.get("interface_inputs", [])]
+        out_wires[n["id"]] = [(prefix + m["chip_id"], m["out_label"]) for m in child.get("interface_outputs", [])]
+
+    for c in spec.get("connections", []):
+        src_id, src_label = c["src_id"], c["src_label"]
+        dst_id, dst_label = c["dst_id"], c["dst_label"]
+        if src_id in out_wires:
+            src_id, src_label = out_wires[src_id][int(src_label)]
+        if dst_id in in_pins:
+            dst_id, dst_label = in_pins[dst_id][int(dst_label)]
+        connections.append({"src_id": src_id, "src_label": src_label, "dst_id": dst_id, "dst_label": dst_label})
+
+    interface_inputs = []
+    for m in spec.get("interface_inputs", []):
+        chip_id, label = m["chip_id"], m["label"]
+        if chip_id in in_pins:
+            chip_id, label = in_pins[chip_id][int(label)]
+        interface_inputs.append({"chip_id": chip_id, "label": label})
+
+    interface_outputs = []
+    for m in spec.get("interface_outputs", []):
+        chip_id, out_label = m["chip_id"], m["out_label"]
+        if chip_id in out_wires:
+            chip_id, out_label = out_wires[chip_id][int(out_label)]
+        interface_outputs.append({"chip_id": chip_id, "label": m["label"], "out_label": out_label})
+
+    return {
+        "nodes": nodes,
+        "connections": connections,
+        "interface_inputs": interface_inputs,
+        "interface_outputs": interface_outputs
+    }
+
 
-def load_composite_from_json(path):
+def load_composite_from_json(path, engine="push", library=None):
     with open(path, "r", encoding="utf-8") as f:
         spec = json.load(f)
-    return COMPOSITE(spec)
+    return COMPOSITE(spec, engine=engine, base_dir=os.path.dirname(os.path.abspath(path)), library=library)
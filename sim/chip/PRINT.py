@@ -2,11 +2,16 @@ from sim.core import Chip
 
 
 class PRINT(Chip):
+    __slots__ = ()
+    IN_LABELS = ("A",)
+    OUT_LABELS = ("A",)
+
     def run(self):
-        if len(self.inputs) != 1:
+        a = self._in[0]
+        if a is None:
             return
 
-        self.outputs["A"] = self._print(self.inputs["A"])
+        self._out[0] = self._print(a)
 
         super().run()
 
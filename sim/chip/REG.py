@@ -0,0 +1,30 @@
+from sim.core import Chip
+
+
+class REG(Chip):
+    """
+    Clocked register. A clock cycle is one COMPOSITE.run(): present()
+    pushes the stored value into the logic, and once the outputs have
+    been sampled clock() loads D unless CLK carries 0. An unconnected or
+    unset CLK counts as enabled, an unset D keeps the stored value. run(),
+    called when D or CLK changes, does nothing, so feedback through a
+    register never loops. CycleSim implements the same rules.
+    """
+    __slots__ = ()
+    IN_LABELS = ("D", "CLK")
+    OUT_LABELS = ("A",)
+
+    def __init__(self, init=0):
+        super().__init__()
+        self._out[0] = init
+
+    def run(self):
+        pass
+
+    def present(self):
+        super().run()
+
+    def clock(self):
+        d, clk = self._in[0], self._in[1]
+        if d is not None and (clk is None or clk > 0):
+            self._out[0] = d
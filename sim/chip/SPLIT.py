@@ -1,18 +1,18 @@
 from sim.core import Chip
 
 class SPLIT(Chip):
-    def __init__(self):
-        super().__init__()
-        self._outs = ["A"]
+    __slots__ = ()
+    IN_LABELS = ("A",)
+    OUT_LABELS = ("A",)
 
     def add_output(self, label):
-        if label not in self._outs:
-            self._outs.append(label)
+        self.output_slot(label)
 
     def run(self):
-        if len(self.inputs) != 1:
+        v = self._in[0]
+        if v is None:
             return
-        v = self.inputs.get("A")
-        for lbl in self._outs:
-            self.outputs[lbl] = v
+        out = self._out
+        for i in range(len(out)):
+            out[i] = v
         super().run()
@@ -0,0 +1,17 @@
+from sim.chip.AND import AND
+from sim.chip.OR import OR
+from sim.chip.NOT import NOT
+from sim.chip.PRINT import PRINT
+from sim.chip.SPLIT import SPLIT
+from sim.chip.REG import REG
+
+from sim.chip.registry import ChipType
+from sim.chip.registry import REGISTRY
+from sim.chip.registry import register
+from sim.chip.registry import register_kernel
+from sim.chip.registry import chip_type
+from sim.chip.registry import build_chip
+
+from sim.chip.COMPOSITE import COMPOSITE
+from sim.chip.COMPOSITE import load_composite_from_json
+from sim.chip.COMPOSITE import flatten_spec
@@ -0,0 +1,92 @@
+from sim.chip.AND import AND
+from sim.chip.OR import OR
+from sim.chip.NOT import NOT
+from sim.chip.PRINT import PRINT
+from sim.chip.SPLIT import SPLIT
+from sim.chip.REG import REG
+
+
+class ChipType:
+    """
+    What the loaders and engines need to know about one chip type:
+
+    - `cls` is the push-model Chip class; `make(node)` builds one from its
+      spec node (default: `cls()`),
+    - `inputs` / `outputs` are the port labels (default: the class's
+      IN_LABELS / OUT_LABELS); with `variadic_outputs` a node may list
+      more outputs under "outputs", all carrying the same value,
+    - `commutative` says the inputs may be reordered, so the optimizer
+      also merges duplicates whose inputs arrive permuted,
+    - `kernel` computes the output from the input values, used by the
+      netlist engines and the editor; None for sequential chips, whose
+      class implements present() and clock() like REG,
+    - `kernels` holds optional fast paths by engine name: "batch" (numpy
+      arrays), "bitslice" (a function of the word mask returning a kernel
+      over (hi, lo) planes) and "codegen" (argument expressions to a
+      Python expression). Engines use their built-in implementation for
+      the standard types when none is registered.
+    """
+
+    def __init__(self, name, cls, inputs=None, outputs=None, make=None, kernel=None,
+                 kernels=None, sequential=False, variadic_outputs=False, commutative=False):
+        self.name = name
+        self.cls = cls
+        self.inputs = tuple(cls.IN_LABELS if inputs is None else inputs)
+        self.outputs = tuple(cls.OUT_LABELS if outputs is None else outputs)
+        self.make = make
+        self.kernel = kernel
+        self.kernels = dict(kernels or {})
+        self.sequential = sequential
+        self.variadic_outputs = variadic_outputs
+        self.commutative = commutative
+
+    def build(self, node):
+        return self.cls() if self.make is None else self.make(node)
+
+    def output_labels(self, node):
+        if self.variadic_outputs:
+            return list(node.get("outputs", self.outputs))
+        return list(self.outputs)
+
+    def __repr__(self):
+        return f"ChipType({self.name!r})"
+
+
+REGISTRY = {}
+
+
+def register(name, cls, **options):
+    """Register (or replace) chip type `name`; see ChipType for the options."""
+    ct = REGISTRY[name] = ChipType(name, cls, **options)
+    return ct
+
+
+def register_kernel(name, engine, kernel):
+    """Add a fast path for `engine` to an already registered chip type."""
+    chip_type(name).kernels[engine] = kernel
+
+
+def chip_type(name):
+    ct = REGISTRY.get(name)
+    if ct is None:
+        raise ValueError(f"Unknown chip type: {name}")
+    return ct
+
+
+def build_chip(node):
+    return chip_type(node["type"]).build(node)
+
+
+def _split(node):
+    obj = SPLIT()
+    for lbl in node.get("outputs", ["A"])[1:]:
+        obj.add_output(lbl)
+    return obj
+
+
+register("AND", AND, kernel=AND._and, commutative=True)
+register("OR", OR, kernel=OR._or, commutative=True)
+register("NOT", NOT, kernel=NOT._not)
+register("PRINT", PRINT, kernel=PRINT._print)
+register("SPLIT", SPLIT, make=_split, kernel=lambda _in: _in, variadic_outputs=True)
+register("REG", REG, make=lambda node: REG(node.get("init", 0)), sequential=True)
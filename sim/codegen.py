@@ -0,0 +1,88 @@
+import hashlib
+import json
+
+from sim.netlist import Netlist
+from sim.chip.PRINT import PRINT
+from sim.chip.registry import REGISTRY
+
+
+_cache = {}
+
+# Inline expressions for the standard types. A type with neither a
+# "codegen" kernel nor an entry here calls its scalar kernel. An emitter
+# that returns one of its arguments makes the gate a plain alias.
+EMITTERS = {
+    "AND": lambda a, b: f"{a} if {a} < {b} else {b}",
+    "OR": lambda a, b: f"{a} if {a} > {b} else {b}",
+    "NOT": lambda a: f"3 - {a}",
+    "PRINT": lambda a: f"_print({a})",
+    "SPLIT": lambda a: a,
+}
+
+
+def spec_hash(spec):
+    return hashlib.sha1(json.dumps(spec, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def generate_source(netlist, name="composite"):
+    """
+    Straight-line Python for a netlist: one argument per interface input,
+    one local per wire, one inline expression per gate in topological
+    order. Outputs that are never driven come back as None.
+    """
+    expr = {i: f"i{i}" for i in range(netlist.n_inputs)}
+    args = ", ".join(expr[i] for i in range(netlist.n_inputs))
+    lines = [f"def {name}({args}):"]
+    emit_gates(netlist, expr, lines)
+    outs = [expr.get(w, "None") for w in netlist.outputs]
+    lines.append(f"    return ({', '.join(outs)}{',' if len(outs) == 1 else ''})")
+    return "\n".join(lines) + "\n"
+
+
+def emit_gates(netlist, expr, lines):
+    """
+    Append one line per combinational gate to `lines`. `expr` maps wires
+    that already have a value (inputs, register outputs) to expressions
+    and is extended with every wire the gates drive.
+    """
+    for g in netlist.order():
+        ct = netlist.chip_types[g]
+        if ct.sequential:
+            continue
+        fanin = netlist.fanin[g]
+        if any(w is None or w not in expr for w in fanin):
+            continue
+        a = [expr[w] for w in fanin]
+        emit = ct.kernels.get("codegen") or EMITTERS.get(ct.name)
+        if emit is not None:
+            e = emit(*a)
+        elif ct.kernel is not None:
+            e = f"_kernels[{ct.name!r}]({', '.join(a)})"
+        else:
+            raise ValueError(f"Can not compile chip type: {ct.name}")
+        if e in a:
+            for o in netlist.fanout[g]:
+                expr[o] = e
+            continue
+        out = f"w{netlist.fanout[g][0]}"
+        lines.append(f"    {out} = {e}")
+        for o in netlist.fanout[g]:
+            expr[o] = out
+
+
+def kernel_scope():
+    """Globals for generated code: _print and every registered scalar kernel."""
+    return {"_print": PRINT._print, "_kernels": {name: ct.kernel for name, ct in REGISTRY.items()}}
+
+
+def compile_spec(spec):
+    """Compile a composite spec to a function, cached per spec hash."""
+    key = spec_hash(spec)
+    fn = _cache.get(key)
+    if fn is None:
+        src = generate_source(Netlist.from_spec(spec))
+        scope = kernel_scope()
+        exec(compile(src, f"<composite {key[:12]}>", "exec"), scope)
+        fn = _cache[key] = scope["composite"]
+        fn.source = src
+    return fn
@@ -1,45 +1,199 @@
 class userInput:
+    __slots__ = ("chip", "inputLabel", "_slot")
+
     def __init__(self):
         self.chip = None
         self.inputLabel = None
+        self._slot = None
 
     def connectTo(self, chip, inputLabel):
         self.chip = chip
         self.inputLabel = inputLabel
-
-    def disconnect(self):
-        self.chip = None
-        self.inputLabel = None
+        self._slot = chip.input_slot(inputLabel)
+
+    def disconnect(self):
+        self.chip = None
+        self.inputLabel = None
+        self._slot = None
 
     def run(self, value):
         if value > 3 or value < 0:
             raise ValueError("This system can not exceed values over 3 or lower than 0")
 
-        self.chip.inputs[self.inputLabel] = value
+        self.chip._in[self._slot] = value
         self.chip.run()
 
 
+class Ports:
+    """
+    Label-keyed view over a chip's input or output slots, kept so code
+    written against the old `inputs`/`outputs` dicts keeps working. An
+    unset slot holds None: indexing a declared port returns it, while
+    len(), iteration and `in` only see ports that carry a value.
+    """
+    __slots__ = ("_chip", "_out")
+
+    def __init__(self, chip, out):
+        self._chip = chip
+        self._out = out
+
+    def _table(self):
+        c = self._chip
+        return (c._out_labels, c._out) if self._out else (c._in_labels, c._in)
+
+    def __getitem__(self, label):
+        labels, values = self._table()
+        if label not in labels:
+            raise KeyError(label)
+        return values[labels.index(label)]
+
+    def get(self, label, default=None):
+        labels, values = self._table()
+        if label in labels:
+            v = values[labels.index(label)]
+            if v is not None:
+                return v
+        return default
+
+    def __setitem__(self, label, value):
+        c = self._chip
+        slot = c.output_slot(label) if self._out else c.input_slot(label)
+        self._table()[1][slot] = value
+
+    def __delitem__(self, label):
+        labels, values = self._table()
+        if label not in labels or values[labels.index(label)] is None:
+            raise KeyError(label)
+        values[labels.index(label)] = None
+
+    def __contains__(self, label):
+        return self.get(label) is not None
+
+    def __iter__(self):
+        labels, values = self._table()
+        return iter([lbl for lbl, v in zip(labels, values) if v is not None])
+
+    def __len__(self):
+        return sum(1 for v in self._table()[1] if v is not None)
+
+    def keys(self):
+        return list(self)
+
+    def values(self):
+        return [v for v in self._table()[1] if v is not None]
+
+    def items(self):
+        labels, values = self._table()
+        return [(lbl, v) for lbl, v in zip(labels, values) if v is not None]
+
+    def update(self, other=(), **kw):
+        for k, v in dict(other, **kw).items():
+            self[k] = v
+
+    def clear(self):
+        values = self._table()[1]
+        for i in range(len(values)):
+            values[i] = None
+
+    def __eq__(self, other):
+        if isinstance(other, Ports):
+            other = dict(other.items())
+        return dict(self.items()) == other
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+
 class Chip:
+    """
+    Ports are resolved to integer slots when a connection is made. Values
+    live in the `_in`/`_out` lists, fanout is kept per output slot as a
+    flat [chip, input slot, chip, input slot, ...] list (an empty tuple
+    until the first connection). Subclasses declare their fixed ports in
+    IN_LABELS/OUT_LABELS; extra labels are appended on first use.
+    """
+    __slots__ = ("_in_labels", "_out_labels", "_in", "_out", "_fanout")
+    IN_LABELS = ()
+    OUT_LABELS = ()
+
     def __init__(self):
-        self.inputs = {}
-        self.outputs = {}
+        self._in_labels = self.IN_LABELS
+        self._out_labels = self.OUT_LABELS
+        self._in = [None] * len(self.IN_LABELS)
+        self._out = [None] * len(self.OUT_LABELS)
+        self._fanout = [()] * len(self.OUT_LABELS)
 
-        self.connections = []
+    def input_slot(self, label):
+        if label in self._in_labels:
+            return self._in_labels.index(label)
+        self._in_labels = self._in_labels + (label,)
+        self._in.append(None)
+        return len(self._in) - 1
+
+    def output_slot(self, label):
+        if label in self._out_labels:
+            return self._out_labels.index(label)
+        self._out_labels = self._out_labels + (label,)
+        self._out.append(None)
+        self._fanout.append(())
+        return len(self._out) - 1
+
+    @property
+    def inputs(self):
+        return Ports(self, False)
+
+    @inputs.setter
+    def inputs(self, values):
+        ports = Ports(self, False)
+        ports.clear()
+        ports.update(values)
+
+    @property
+    def outputs(self):
+        return Ports(self, True)
+
+    @outputs.setter
+    def outputs(self, values):
+        ports = Ports(self, True)
+        ports.clear()
+        ports.update(values)
+
+    @property
+    def connections(self):
+        return [
+            (fan[i], fan[i]._in_labels[fan[i + 1]], self._out_labels[port])
+            for port, fan in enumerate(self._fanout)
+            for i in range(0, len(fan), 2)
+        ]
 
     def addConnection(self, chip, label, outLabel):
-        self.connections.append((chip, label, outLabel))
-
-    def removeConnection(self, chip, label, outLabel):
-        try:
-            self.connections.remove((chip, label, outLabel))
-        except ValueError:
-            pass
+        port = self.output_slot(outLabel)
+        slot = chip.input_slot(label)
+        fan = self._fanout[port]
+        if not fan:
+            fan = self._fanout[port] = []
+        fan.append(chip)
+        fan.append(slot)
+
+    def removeConnection(self, chip, label, outLabel):
+        if outLabel not in self._out_labels or label not in chip._in_labels:
+            return
+        fan = self._fanout[self._out_labels.index(outLabel)]
+        slot = chip._in_labels.index(label)
+        for i in range(0, len(fan), 2):
+            if fan[i] is chip and fan[i + 1] == slot:
+                del fan[i:i + 2]
+                return
 
     def run(self):
-        for (chip, label, out) in self.connections:
-            chip.inputs[label] = self.outputs[out]
-            chip.run()
+        out = self._out
+        for port, fan in enumerate(self._fanout):
+            v = out[port]
+            it = iter(fan)
+            for chip, slot in zip(it, it):
+                chip._in[slot] = v
+                chip.run()
 
     def reset(self):
         self.inputs = {}
-        self.outputs = {}
+        self.outputs = {}
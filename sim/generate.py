@@ -0,0 +1,229 @@
+import argparse
+import json
+import random
+import sys
+
+
+DEFAULT_MIX = {"AND": 0.4, "OR": 0.4, "NOT": 0.2}
+ARITY = {"AND": 2, "OR": 2, "NOT": 1, "PRINT": 1}
+
+
+class _Circuit:
+    """
+    Gates over numbered wires: wires 0..k-1 are the interface inputs, gate
+    g drives wire k + g. spec() lays it out the way Editor.to_spec does:
+    ids are numbers as strings, a wire read more than once goes through a
+    SPLIT with outputs "A", "B", ..., every unread gate output becomes an
+    interface output labelled "A".
+    """
+
+    def __init__(self, n_inputs):
+        self.n_inputs = n_inputs
+        self.types = []
+        self.fanin = []
+        self.readers = [0] * n_inputs
+
+    @property
+    def n_wires(self):
+        return len(self.readers)
+
+    def add(self, t, *wires):
+        readers = self.readers
+        for w in wires:
+            readers[w] += 1
+        self.types.append(t)
+        self.fanin.append(wires)
+        readers.append(0)
+        return len(readers) - 1
+
+    def spec(self):
+        k = self.n_inputs
+        unread = self.readers[:k].count(0)
+        if unread:
+            raise ValueError(f"{unread} of {k} inputs are not read by any gate; "
+                             f"generate more gates or fewer inputs")
+        nodes = [{"id": str(g), "type": t} for g, t in enumerate(self.types)]
+        connections = []
+        interface_inputs = []
+        interface_outputs = []
+        split = {}
+        for w, n in enumerate(self.readers):
+            if n == 0:
+                if w >= k:
+                    interface_outputs.append({"chip_id": str(w - k), "label": "A", "out_label": "A"})
+            elif n > 1:
+                sid = str(len(nodes))
+                nodes.append({"id": sid, "type": "SPLIT", "outputs": [chr(ord('A') + j) for j in range(n)]})
+                if w < k:
+                    interface_inputs.append((w, {"chip_id": sid, "label": "A"}))
+                else:
+                    connections.append({"src_id": str(w - k), "src_label": "A", "dst_id": sid, "dst_label": "A"})
+                split[w] = [sid, 0]
+        for g, wires in enumerate(self.fanin):
+            dst = str(g)
+            for label, w in zip("AB", wires):
+                s = split.get(w)
+                if s is not None:
+                    connections.append({"src_id": s[0], "src_label": chr(ord('A') + s[1]), "dst_id": dst, "dst_label": label})
+                    s[1] += 1
+                elif w < k:
+                    interface_inputs.append((w, {"chip_id": dst, "label": label}))
+                else:
+                    connections.append({"src_id": str(w - k), "src_label": "A", "dst_id": dst, "dst_label": label})
+        interface_inputs.sort(key=lambda im: im[0])
+        return {
+            "nodes": nodes,
+            "connections": connections,
+            "interface_inputs": [m for _, m in interface_inputs],
+            "interface_outputs": interface_outputs
+        }
+
+
+def _gate_types(r, mix, n):
+    types = list(mix)
+    for t in types:
+        if t not in ARITY:
+            raise ValueError(f"Can not generate chip type: {t}")
+    return r.choices(types, [mix[t] for t in types], k=n)
+
+
+def _source(r, lo, hi, readers, fanout):
+    """A wire in [lo, hi), unread wires first, then by the fanout distribution."""
+    if fanout == "uniform":
+        return lo + int(r.random() * (hi - lo))
+    if fanout == "preferential":
+        # Best of four draws by reader count: wires that already have
+        # readers attract more, so a few end up driving many pins.
+        w = r.randrange(lo, hi)
+        for _ in range(3):
+            cand = r.randrange(lo, hi)
+            if readers[cand] > readers[w]:
+                w = cand
+        return w
+    raise ValueError(f"Unknown fanout distribution: {fanout}")
+
+
+def layered(gates, depth=16, inputs=32, mix=None, fanout="uniform", seed=0):
+    """
+    `depth` layers of about gates / depth gates; each gate reads wires of
+    the layer below, every wire of that layer read at least once where the
+    layer sizes allow. Inputs a narrow first layer can not take are read
+    by the following layers, so every input stays an interface input.
+    """
+    r = random.Random(seed)
+    types = _gate_types(r, mix or DEFAULT_MIX, gates)
+    c = _Circuit(inputs)
+    lo, hi = 0, inputs
+    per_layer = max(1, gates // depth)
+    made = 0
+    pending = []
+    while made < gates:
+        n = min(per_layer, gates - made)
+        unread = list(range(lo, hi))
+        r.shuffle(unread)
+        unread += pending
+        start = c.n_wires
+        for t in types[made:made + n]:
+            srcs = []
+            for _ in range(ARITY[t]):
+                srcs.append(unread.pop() if unread else _source(r, lo, hi, c.readers, fanout))
+            c.add(t, *srcs)
+        made += n
+        pending = [w for w in unread if w < inputs]
+        lo, hi = start, c.n_wires
+    return c.spec()
+
+
+def random_dag(gates, inputs=32, window=None, mix=None, fanout="uniform", seed=0):
+    """
+    Each gate reads earlier wires chosen at random. `window` limits sources
+    to the last `window` wires, which bounds fan-in distance and makes the
+    circuit deeper; None draws from every earlier wire.
+    """
+    r = random.Random(seed)
+    types = _gate_types(r, mix or DEFAULT_MIX, gates)
+    c = _Circuit(inputs)
+    unread = list(range(inputs))
+    r.shuffle(unread)
+    for t in types:
+        hi = c.n_wires
+        lo = 0 if window is None else max(0, hi - window)
+        srcs = []
+        for _ in range(ARITY[t]):
+            srcs.append(unread.pop() if unread else _source(r, lo, hi, c.readers, fanout))
+        c.add(t, *srcs)
+    return c.spec()
+
+
+def _xor(c, a, b):
+    # Exact on {0, 3}: OR(AND(a, NOT b), AND(NOT a, b)).
+    return c.add("OR", c.add("AND", a, c.add("NOT", b)), c.add("AND", c.add("NOT", a), b))
+
+
+def _full_adder(c, a, b, cin):
+    x = _xor(c, a, b)
+    return _xor(c, x, cin), c.add("OR", c.add("AND", a, b), c.add("AND", cin, x))
+
+
+def adder_array(bits=8, rows=4):
+    """
+    `rows` ripple-carry adders of `bits` bits in a chain, each adding one
+    more operand to the running sum: inputs are rows + 1 operands (least
+    significant bit first) followed by one carry-in per row. Boolean
+    values are 0 and 3. Each full adder is 13 gates plus 4 SPLITs, so the
+    spec has 13 * bits * rows gates in 17 * bits * rows nodes.
+    """
+    c = _Circuit(bits * (rows + 1) + rows)
+    acc = list(range(bits))
+    for row in range(rows):
+        operand = range(bits * (row + 1), bits * (row + 2))
+        carry = bits * (rows + 1) + row
+        nxt = []
+        for a, b in zip(acc, operand):
+            s, carry = _full_adder(c, a, b, carry)
+            nxt.append(s)
+        acc = nxt
+    return c.spec()
+
+
+TOPOLOGIES = {
+    "layered": layered,
+    "dag": random_dag,
+    "adder": adder_array,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic composite spec.")
+    parser.add_argument("topology", choices=sorted(TOPOLOGIES))
+    parser.add_argument("-o", "--output", help="write the spec here instead of stdout")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--gates", type=int, default=1000)
+    parser.add_argument("--inputs", type=int, default=32)
+    parser.add_argument("--depth", type=int, default=16, help="layered: number of layers")
+    parser.add_argument("--window", type=int, default=None, help="dag: source window")
+    parser.add_argument("--fanout", choices=("uniform", "preferential"), default="uniform")
+    parser.add_argument("--mix", default=None, help='gate weights as JSON, e.g. {"AND": 1, "NOT": 1}')
+    parser.add_argument("--bits", type=int, default=8, help="adder: operand width")
+    parser.add_argument("--rows", type=int, default=4, help="adder: number of adders")
+    args = parser.parse_args()
+
+    mix = json.loads(args.mix) if args.mix else None
+    if args.topology == "layered":
+        spec = layered(args.gates, args.depth, args.inputs, mix, args.fanout, args.seed)
+    elif args.topology == "dag":
+        spec = random_dag(args.gates, args.inputs, args.window, mix, args.fanout, args.seed)
+    else:
+        spec = adder_array(args.bits, args.rows)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(spec, f)
+    else:
+        json.dump(spec, sys.stdout)
+    print(f"{len(spec['nodes'])} nodes, {len(spec['interface_inputs'])} inputs, "
+          f"{len(spec['interface_outputs'])} outputs", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+from sim.chip.registry import chip_type
+
+
+class Netlist:
+    """
+    Flat, wire-indexed view of a composite spec.
+
+    Wires 0..k-1 are the interface inputs, every gate output port gets the
+    next free wire. A gate reads the wires in `fanin[g]` (None when the pin
+    is unconnected) and writes one value to every wire in `fanout[g]`.
+    Sequential gates (REG) are only accepted with `sequential=True`; they
+    act as level-0 sources and their inputs are sampled by the caller.
+    """
+
+    def __init__(self):
+        self.nodes = []
+        self.ids = []
+        self.types = []
+        self.chip_types = []
+        self.out_labels = []
+        self.fanin = []
+        self.fanout = []
+        self.n_inputs = 0
+        self.n_wires = 0
+        self.outputs = []
+
+    @classmethod
+    def from_spec(cls, spec, sequential=False):
+        net = cls()
+        index = {}
+        wire_of = {}
+
+        inputs = spec.get("interface_inputs", [])
+        net.n_inputs = len(inputs)
+        net.n_wires = len(inputs)
+
+        for n in spec.get("nodes", []):
+            t = n["type"]
+            ct = chip_type(t)
+            if ct.sequential and not sequential:
+                raise ValueError(f"Chip type {t} needs the cycle simulator")
+            g = len(net.ids)
+            net.nodes.append(n)
+            index[n["id"]] = g
+            outs = ct.output_labels(n)
+            net.ids.append(n["id"])
+            net.types.append(t)
+            net.chip_types.append(ct)
+            net.out_labels.append(outs)
+            net.fanin.append([None] * len(ct.inputs))
+            net.fanout.append([])
+            for lbl in outs:
+                wire_of[(g, lbl)] = net._new_wire(g)
+
+        def pin(chip_id, label):
+            g = index[chip_id]
+            return g, net.chip_types[g].inputs.index(label)
+
+        def wire(chip_id, label):
+            g = index[chip_id]
+            if (g, label) not in wire_of:
+                wire_of[(g, label)] = net._new_wire(g)
+            return wire_of[(g, label)]
+
+        for i, m in enumerate(inputs):
+            g, slot = pin(m["chip_id"], m["label"])
+            net.fanin[g][slot] = i
+        for c in spec.get("connections", []):
+            g, slot = pin(c["dst_id"], c["dst_label"])
+            net.fanin[g][slot] = wire(c["src_id"], c["src_label"])
+        for m in spec.get("interface_outputs", []):
+            net.outputs.append(wire(m["chip_id"], m["out_label"]))
+        return net
+
+    def _new_wire(self, g):
+        w = self.n_wires
+        self.n_wires += 1
+        self.fanout[g].append(w)
+        return w
+
+    def __len__(self):
+        return len(self.ids)
+
+    def drivers(self):
+        drv = [None] * self.n_wires
+        for g, ws in enumerate(self.fanout):
+            for w in ws:
+                drv[w] = g
+        return drv
+
+    def levels(self):
+        drv = self.drivers()
+        pending = [0] * len(self.ids)
+        readers = [[] for _ in range(self.n_wires)]
+        ready = []
+        for g, ws in enumerate(self.fanin):
+            if self.chip_types[g].sequential:
+                ws = ()
+            for w in ws:
+                if w is not None and drv[w] is not None:
+                    pending[g] += 1
+                    readers[w].append(g)
+            if pending[g] == 0:
+                ready.append(g)
+
+        out = []
+        done = 0
+        while ready:
+            out.append(ready)
+            nxt = []
+            for g in ready:
+                done += 1
+                for w in self.fanout[g]:
+                    for r in readers[w]:
+                        pending[r] -= 1
+                        if pending[r] == 0:
+                            nxt.append(r)
+            ready = nxt
+
+        if done != len(self.ids):
+            raise ValueError("Netlist has a combinational cycle")
+        return out
+
+    def order(self):
+        return [g for lvl in self.levels() for g in lvl]
@@ -0,0 +1,216 @@
+import json
+import os
+import sys
+
+from sim.netlist import Netlist
+from sim.chip.COMPOSITE import flatten_spec
+from sim.chip.registry import REGISTRY
+
+
+# Lattice duals for idempotence and absorption, e.g. AND(x, OR(x, y)) = x.
+DUAL = {"AND": "OR", "OR": "AND"}
+
+
+def _input_ref(i):
+    return ("i", i)
+
+
+def _gate_ref(chip_id, label):
+    return ("g", chip_id, label)
+
+
+def optimize_spec(spec, base_dir=None, library=None):
+    """
+    Simplify a composite spec and return (new_spec, stats).
+
+    Passes, applied in one topological sweep followed by a liveness sweep:
+    SPLIT collapsing, NOT-NOT removal, constant folding (gates fed by an
+    undriven wire never fire, AND/OR of a wire with itself, lattice
+    absorption such as AND(x, OR(x, y)) = x), hash-consed common
+    subexpression merging (operands sorted for types registered as
+    commutative) and dead-gate elimination. Pin labels come from the chip
+    registry. PRINT gates are kept for their side effect. Interface inputs
+    keep their order; an input that ends up feeding several pins gets a
+    single fan-out SPLIT.
+    """
+    if any(n["type"] == "COMPOSITE" for n in spec.get("nodes", [])):
+        spec = flatten_spec(spec, base_dir, library)
+    net = Netlist.from_spec(spec)
+    types = {n["id"]: n["type"] for n in spec.get("nodes", [])}
+    pins = {}
+    for nid, t in types.items():
+        pins[nid] = {lbl: None for lbl in REGISTRY[t].inputs}
+    for i, m in enumerate(spec.get("interface_inputs", [])):
+        pins[m["chip_id"]][m["label"]] = _input_ref(i)
+    for c in spec.get("connections", []):
+        pins[c["dst_id"]][c["dst_label"]] = _gate_ref(c["src_id"], c["src_label"])
+
+    kept = {}
+    seen = {}
+    stats = {"before": len(types), "split": 0, "not_not": 0, "folded": 0, "cse": 0, "dead": 0}
+    alias = {}
+
+    def resolve(ref):
+        while ref in alias:
+            ref = alias[ref]
+        if ref is not None and ref[0] == "g" and ref[1] not in kept:
+            return None
+        return ref
+
+    def replace(chip_id, ref):
+        for lbl in outs_of(chip_id):
+            alias[_gate_ref(chip_id, lbl)] = ref
+
+    node_outs = {n["id"]: REGISTRY[n["type"]].output_labels(n) for n in spec.get("nodes", [])}
+
+    def outs_of(chip_id):
+        return node_outs[chip_id]
+
+    for g in net.order():
+        nid = net.ids[g]
+        t = types[nid]
+        ins = [None if r is None else resolve(r) for r in pins[nid].values()]
+        pins[nid] = dict(zip(pins[nid], ins))
+
+        if None in ins:
+            replace(nid, None)
+            stats["folded"] += 1
+            continue
+        if t == "SPLIT":
+            replace(nid, ins[0])
+            stats["split"] += 1
+            continue
+        if t == "NOT" and ins[0][0] == "g" and kept.get(ins[0][1]) == "NOT":
+            replace(nid, pins[ins[0][1]]["A"])
+            stats["not_not"] += 1
+            continue
+        if t in DUAL:
+            a, b = ins
+            other = DUAL[t]
+            if a == b:
+                replace(nid, a)
+                stats["folded"] += 1
+                continue
+            absorbed = None
+            for x, y in ((a, b), (b, a)):
+                if y[0] == "g" and kept.get(y[1]) == other and x in pins[y[1]].values():
+                    absorbed = x
+            if absorbed is not None:
+                replace(nid, absorbed)
+                stats["folded"] += 1
+                continue
+        # Pin order is the registered input order, never the order the spec
+        # listed pins in; commutative types sort their operands so AND(a, b)
+        # and AND(b, a) share a key.
+        ct = REGISTRY[t]
+        if t != "PRINT" and not ct.sequential:
+            key = (t, tuple(sorted(ins)) if ct.commutative else tuple(ins))
+            if key in seen:
+                for lbl in outs_of(nid):
+                    alias[_gate_ref(nid, lbl)] = _gate_ref(seen[key], lbl)
+                stats["cse"] += 1
+                continue
+            seen[key] = nid
+        kept[nid] = t
+
+    outputs = [resolve(_gate_ref(m["chip_id"], m["out_label"])) for m in spec.get("interface_outputs", [])]
+
+    live = set()
+    stack = [r[1] for r in outputs if r is not None and r[0] == "g"]
+    stack += [nid for nid, t in kept.items() if t == "PRINT"]
+    while stack:
+        nid = stack.pop()
+        if nid in live:
+            continue
+        live.add(nid)
+        stack.extend(r[1] for r in pins[nid].values() if r[0] == "g")
+    stats["dead"] = len(kept) - len(live)
+
+    new_spec = _rebuild(spec, types, pins, live, outputs)
+    stats["after"] = len(new_spec["nodes"])
+    return new_spec, stats
+
+
+def _rebuild(spec, types, pins, live, outputs):
+    nodes = []
+    connections = []
+    readers = [[] for _ in spec.get("interface_inputs", [])]
+    taken = set(types)
+
+    def fresh(base):
+        nid, n = base, 0
+        while nid in taken:
+            n += 1
+            nid = f"{base}_{n}"
+        taken.add(nid)
+        return nid
+
+    for n in spec.get("nodes", []):
+        nid = n["id"]
+        if nid not in live:
+            continue
+        nodes.append(dict(n))
+        for lbl, ref in pins[nid].items():
+            if ref[0] == "i":
+                readers[ref[1]].append((nid, lbl))
+            else:
+                connections.append({"src_id": ref[1], "src_label": ref[2], "dst_id": nid, "dst_label": lbl})
+
+    out_refs = []
+    undriven = None
+    for ref in outputs:
+        if ref is None:
+            if undriven is None:
+                undriven = fresh("undriven")
+                nodes.append({"id": undriven, "type": "SPLIT", "outputs": ["A"]})
+            ref = _gate_ref(undriven, "A")
+        elif ref[0] == "i":
+            readers[ref[1]].append(None)
+        out_refs.append(ref)
+
+    interface_inputs = []
+    fan = {}
+    for i, rd in enumerate(readers):
+        if len(rd) == 1 and rd[0] is not None:
+            interface_inputs.append({"chip_id": rd[0][0], "label": rd[0][1]})
+            continue
+        sid = fresh(f"in{i}")
+        labels = [chr(ord('A') + j) for j in range(max(1, len(rd)))]
+        nodes.append({"id": sid, "type": "SPLIT", "outputs": labels})
+        interface_inputs.append({"chip_id": sid, "label": "A"})
+        for lbl, pin in zip(labels, rd):
+            if pin is None:
+                fan[i] = (sid, lbl)
+            else:
+                connections.append({"src_id": sid, "src_label": lbl, "dst_id": pin[0], "dst_label": pin[1]})
+
+    interface_outputs = []
+    for m, ref in zip(spec.get("interface_outputs", []), out_refs):
+        chip_id, out_label = fan[ref[1]] if ref[0] == "i" else ref[1:]
+        interface_outputs.append({"chip_id": chip_id, "label": m["label"], "out_label": out_label})
+
+    return {
+        "nodes": nodes,
+        "connections": connections,
+        "interface_inputs": interface_inputs,
+        "interface_outputs": interface_outputs
+    }
+
+
+def main():
+    if len(sys.argv) not in (2, 3):
+        print("usage: python -m sim.optimize composite.json [optimized.json]")
+        sys.exit(2)
+    with open(sys.argv[1], "r", encoding="utf-8") as f:
+        spec = json.load(f)
+    new_spec, stats = optimize_spec(spec, os.path.dirname(os.path.abspath(sys.argv[1])))
+    print(f"gates: {stats['before']} -> {stats['after']}")
+    for k in ("split", "not_not", "folded", "cse", "dead"):
+        print(f"  {k}: {stats[k]}")
+    if len(sys.argv) == 3:
+        with open(sys.argv[2], "w", encoding="utf-8") as f:
+            json.dump(new_spec, f)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,167 @@
+import json
+import time
+
+from sim.core import Chip
+
+
+def _chip_classes():
+    import sim.chip  # noqa: F401  (registers the built-in chip classes)
+    found = []
+    stack = list(Chip.__subclasses__())
+    while stack:
+        cls = stack.pop()
+        found.append(cls)
+        stack.extend(cls.__subclasses__())
+    return found
+
+
+class Profiler:
+    """
+    Opt-in profiling of push-model propagation. While enabled, every Chip
+    subclass that defines run() has it swapped for a wrapper that records
+
+    - evaluations per chip instance,
+    - self time per chip type (time spent in downstream chips is not
+      counted twice),
+    - the deepest chain of nested run() calls,
+    - fanout pushes per chip, the hot spots of propagation, counted in
+      Chip.run so a chip that returns without propagating adds none,
+    - self time per call path, for collapsed-stack flame graphs.
+
+    disable() puts the original methods back, so nothing is left behind
+    when profiling is off. Chip names default to "TYPE#n" in first-seen
+    order; watch() names the nodes of a push-engine COMPOSITE by id.
+    """
+
+    def __init__(self):
+        self._saved = {}
+        self.names = {}
+        self.reset()
+
+    def reset(self):
+        self.counts = {}
+        self.self_time = {}
+        self.type_counts = {}
+        self.fanout = {}
+        self.stacks = {}
+        self.max_depth = 0
+        self._stack = []
+        self._chips = {}
+
+    def watch(self, composite, prefix=""):
+        for nid, obj in composite._nodes.items():
+            if obj is not None:
+                self.names[id(obj)] = prefix + nid
+        return composite
+
+    def _name(self, chip):
+        key = id(chip)
+        name = self.names.get(key)
+        if name is None:
+            name = self.names[key] = f"{type(chip).__name__}#{len(self.names)}"
+        return name
+
+    def _wrap(self, run):
+        prof = self
+        clock = time.perf_counter
+
+        def profiled_run(chip):
+            stack = prof._stack
+            key = id(chip)
+            prof._chips[key] = chip
+            prof.counts[key] = prof.counts.get(key, 0) + 1
+            frame = [type(chip).__name__, 0.0]
+            stack.append(frame)
+            if len(stack) > prof.max_depth:
+                prof.max_depth = len(stack)
+            start = clock()
+            try:
+                return run(chip)
+            finally:
+                elapsed = clock() - start
+                stack.pop()
+                own = elapsed - frame[1]
+                if stack:
+                    stack[-1][1] += elapsed
+                t = frame[0]
+                prof.self_time[t] = prof.self_time.get(t, 0.0) + own
+                prof.type_counts[t] = prof.type_counts.get(t, 0) + 1
+                path = ";".join([f[0] for f in stack] + [t])
+                prof.stacks[path] = prof.stacks.get(path, 0.0) + own
+
+        profiled_run.__wrapped__ = run
+        return profiled_run
+
+    def _wrap_push(self, run):
+        # Chip.run is the propagation step every chip reaches through
+        # super().run(); a chip that returns early (unset inputs, a REG
+        # between clocks) never gets here and pushes nothing.
+        prof = self
+
+        def counted_run(chip):
+            key = id(chip)
+            prof._chips[key] = chip
+            prof.fanout[key] = prof.fanout.get(key, 0) + sum(len(fan) for fan in chip._fanout) // 2
+            return run(chip)
+
+        counted_run.__wrapped__ = run
+        return counted_run
+
+    def enable(self):
+        if self._saved:
+            return self
+        base = Chip.__dict__["run"]
+        self._saved[Chip] = base
+        Chip.run = self._wrap_push(base)
+        for cls in _chip_classes():
+            run = cls.__dict__.get("run")
+            if run is not None:
+                self._saved[cls] = run
+                cls.run = self._wrap(run)
+        return self
+
+    def disable(self):
+        for cls, run in self._saved.items():
+            cls.run = run
+        self._saved = {}
+        return self
+
+    @property
+    def enabled(self):
+        return bool(self._saved)
+
+    def __enter__(self):
+        return self.enable()
+
+    def __exit__(self, *exc):
+        self.disable()
+
+    def hot_spots(self, n=10):
+        """The `n` chips that pushed the most values to their fanout."""
+        top = sorted(self.fanout.items(), key=lambda kv: kv[1], reverse=True)[:n]
+        return [(self._name(self._chips[key]), pushes) for key, pushes in top if pushes]
+
+    def report(self, top=10):
+        return {
+            "evaluations": sum(self.counts.values()),
+            "max_depth": self.max_depth,
+            "types": {
+                t: {"evaluations": self.type_counts[t], "self_seconds": self.self_time[t]}
+                for t in sorted(self.self_time)
+            },
+            "chips": {
+                self._name(self._chips[key]): n
+                for key, n in sorted(self.counts.items(), key=lambda kv: kv[1], reverse=True)
+            },
+            "fanout_hot_spots": [{"chip": name, "pushes": n} for name, n in self.hot_spots(top)],
+        }
+
+    def write_json(self, path, top=10):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(top), f, indent=2)
+
+    def write_collapsed(self, path):
+        """One "TYPE;TYPE;... microseconds" line per call path (flamegraph.pl, speedscope)."""
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, seconds in sorted(self.stacks.items()):
+                f.write(f"{stack} {max(1, round(seconds * 1e6))}\n")
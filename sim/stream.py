@@ -0,0 +1,180 @@
+"""
+Headless runner: streams input vectors through a composite and writes one
+output row per vector.
+
+    python main.py run compiled/composite.json < vectors.csv
+    python -m sim.stream circuit.json -i vectors.ndjson -o out.ndjson
+    python -m sim.stream circuit.json --engine batch --chunk 65536 -i big.csv
+
+Input is CSV (one row of digits per vector; a first row that is not all
+digits is a header and skipped) or NDJSON (one JSON list per line). Rows
+are read, evaluated and written `--chunk` vectors at a time, so memory
+does not grow with the length of the stream. Outputs that are never
+driven come out empty (CSV) or null (NDJSON). Throughput goes to stderr.
+"""
+import argparse
+import csv
+import itertools
+import json
+import sys
+import time
+
+from sim.chip import load_composite_from_json
+
+
+FORMATS = ("csv", "ndjson")
+ENGINES = ("compiled", "batch", "push", "levelized", "event", "cycle")
+
+
+def _vector(values, k, lineno):
+    if len(values) != k:
+        raise ValueError(f"line {lineno}: expected {k} input values, got {len(values)}")
+    for v in values:
+        if type(v) is not int or v < 0 or v > 3:
+            raise ValueError(f"line {lineno}: input values must be digits 0..3, got {v!r}")
+    return tuple(values)
+
+
+def read_vectors(f, fmt, k):
+    """Yield input tuples from a CSV or NDJSON stream, one line at a time."""
+    if fmt == "csv":
+        for lineno, row in enumerate(csv.reader(f), 1):
+            if not any(c.strip() for c in row):
+                continue
+            try:
+                values = [int(c) for c in row]
+            except ValueError:
+                if lineno == 1:
+                    continue
+                raise ValueError(f"line {lineno}: not a row of digits: {','.join(row)}") from None
+            yield _vector(values, k, lineno)
+    elif fmt == "ndjson":
+        for lineno, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            values = json.loads(line)
+            if not isinstance(values, list):
+                raise ValueError(f"line {lineno}: expected a JSON list of digits")
+            yield _vector(values, k, lineno)
+    else:
+        raise ValueError(f"Unknown format: {fmt}")
+
+
+def _writer(f, fmt):
+    if fmt == "csv":
+        return csv.writer(f, lineterminator="\n").writerow
+    if fmt == "ndjson":
+        return lambda outs: f.write(json.dumps(list(outs), separators=(",", ":")) + "\n")
+    raise ValueError(f"Unknown format: {fmt}")
+
+
+def _evaluator(composite, engine):
+    """function(list of input tuples) -> list of output rows."""
+    if engine == "compiled":
+        fn = composite.compiled()
+        return lambda block: [fn(*v) for v in block]
+
+    if engine == "batch":
+        import numpy as np
+        from sim.batch import UNSET
+        k = composite._n_inputs
+
+        def run_batch(block):
+            out = composite.run_batch(np.array(block, dtype=np.uint8).reshape(len(block), k))
+            return [[None if v == UNSET else v for v in row] for row in out.tolist()]
+        return run_batch
+
+    k = composite._n_inputs
+    m = len(composite._out)
+
+    def run(block):
+        rows = []
+        for v in block:
+            composite._in[:k] = v
+            composite.run()
+            rows.append(composite._out[:m])
+        return rows
+    return run
+
+
+def stream(composite, vectors, out, fmt="csv", engine="compiled", chunk=1024):
+    """
+    Evaluate `vectors` through `composite` `chunk` at a time, writing and
+    flushing each chunk's rows to `out` before reading the next. Returns
+    the number of vectors. With the compiled and push engines PRINT nodes
+    print to stdout, so give an output file when they are present.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine: {engine}")
+    run = _evaluator(composite, engine)
+    write = _writer(out, fmt)
+    it = iter(vectors)
+    n = 0
+    while True:
+        block = list(itertools.islice(it, chunk))
+        if not block:
+            break
+        for outs in run(block):
+            write(outs)
+        out.flush()
+        n += len(block)
+    return n
+
+
+def _header(spec):
+    # Editor specs label every output "A"; use a "name" when the spec gives
+    # one and the output index otherwise, so the columns stay distinct.
+    return [m.get("name", str(i)) for i, m in enumerate(spec.get("interface_outputs", []))]
+
+
+def _format(path):
+    return "ndjson" if path and path.endswith((".ndjson", ".jsonl")) else "csv"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="run", description="Stream input vectors through a composite.")
+    parser.add_argument("spec", help="composite JSON, e.g. compiled/composite.json")
+    parser.add_argument("-i", "--input", help="input vectors (default stdin)")
+    parser.add_argument("-o", "--output", help="output rows (default stdout)")
+    parser.add_argument("-f", "--format", choices=FORMATS, help="input format (default from the file name, else csv)")
+    parser.add_argument("--output-format", choices=FORMATS, help="output format (default: the input format)")
+    parser.add_argument("--engine", choices=ENGINES, default="compiled")
+    parser.add_argument("--chunk", type=int, default=1024, help="vectors read and written at a time")
+    parser.add_argument("--header", action="store_true", help="write the output labels as a CSV header")
+    parser.add_argument("-q", "--quiet", action="store_true", help="do not report throughput")
+    args = parser.parse_args(argv)
+
+    fmt = args.format or _format(args.input)
+    out_fmt = args.output_format or (_format(args.output) if args.output else fmt)
+    # The compiled and batch paths only need the (flattened) spec.
+    load_engine = "compiled" if args.engine in ("compiled", "batch") else args.engine
+
+    start = time.perf_counter()
+    composite = load_composite_from_json(args.spec, engine=load_engine)
+    loaded = time.perf_counter()
+
+    src = open(args.input, "r", encoding="utf-8", newline="") if args.input else sys.stdin
+    dst = open(args.output, "w", encoding="utf-8", newline="") if args.output else sys.stdout
+    try:
+        if args.header and out_fmt == "csv":
+            _writer(dst, "csv")(_header(composite.spec))
+        vectors = read_vectors(src, fmt, composite._n_inputs)
+        n = stream(composite, vectors, dst, out_fmt, args.engine, max(1, args.chunk))
+    except ValueError as e:
+        sys.exit(f"error: {e}")
+    finally:
+        if args.input:
+            src.close()
+        if args.output:
+            dst.close()
+    done = time.perf_counter()
+
+    if not args.quiet:
+        seconds = max(done - loaded, 1e-9)
+        print(f"{n} vectors in {seconds:.3f} s, {n / seconds:,.0f} vectors/s "
+              f"(load {loaded - start:.3f} s, {len(composite.spec.get('nodes', []))} nodes)",
+              file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,157 @@
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from sim.chip.COMPOSITE import load_composite_from_json
+
+
+_dut = None
+_ref = None
+
+
+def _load(target, library):
+    if callable(target):
+        return target
+    return load_composite_from_json(target, library=library).compiled()
+
+
+def _worker_init(path, reference, library):
+    global _dut, _ref
+    _dut = _load(path, library)
+    _ref = _load(reference, library)
+
+
+def _digits(idx, k):
+    out = [0] * k
+    for i in range(k - 1, -1, -1):
+        out[i] = idx & 3
+        idx >>= 2
+    return out
+
+
+def _check_range(start, stop, k, limit):
+    mismatches = []
+    for idx in range(start, stop):
+        vec = _digits(idx, k)
+        got = tuple(_dut(*vec))
+        expected = tuple(_ref(*vec))
+        if got != expected:
+            mismatches.append((tuple(vec), got, expected))
+            if len(mismatches) >= limit:
+                return idx + 1 - start, mismatches
+    return stop - start, mismatches
+
+
+def iter_mismatches(path, reference, workers=None, max_failures=10, shard=1 << 14, library=None, progress=None):
+    """
+    Check every one of the 4^k input vectors of the composite at `path`
+    against `reference`, another composite path or a picklable callable
+    f(*digits) -> outputs. Yields (vector, got, expected) in vector order
+    as shards finish and stops after `max_failures` mismatches.
+    `progress(done, total)` is called after each shard.
+    """
+    k = len(load_composite_from_json(path, library=library).spec.get("interface_inputs", []))
+    if not callable(reference):
+        rk = len(load_composite_from_json(reference, library=library).spec.get("interface_inputs", []))
+        if rk != k:
+            raise ValueError(f"Composite has {k} inputs but reference has {rk}")
+    total = 4 ** k
+    shards = ((lo, min(lo + shard, total)) for lo in range(0, total, shard))
+    found = 0
+    done = 0
+
+    if workers == 1:
+        _worker_init(path, reference, library)
+        for lo, hi in shards:
+            n, bad = _check_range(lo, hi, k, max_failures - found)
+            done += n
+            for m in bad:
+                found += 1
+                yield m
+            if progress:
+                progress(done, total)
+            if found >= max_failures:
+                return
+        return
+
+    # Shards finish in any order; their mismatches are held back until every
+    # earlier shard is in, so the first max_failures come out in vector
+    # order, the same as with one worker.
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(workers, initializer=_worker_init, initargs=(path, reference, library)) as pool:
+        pending = {}
+        ready = {}
+        next_lo = 0
+        try:
+            while True:
+                while len(pending) + len(ready) < workers * 2:
+                    nxt = next(shards, None)
+                    if nxt is None:
+                        break
+                    pending[pool.submit(_check_range, nxt[0], nxt[1], k, max_failures)] = nxt
+                if not pending and not ready:
+                    return
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in finished:
+                    lo, hi = pending.pop(fut)
+                    n, bad = fut.result()
+                    done += n
+                    ready[lo] = (hi, bad)
+                while next_lo in ready:
+                    hi, bad = ready.pop(next_lo)
+                    next_lo = hi
+                    for m in bad:
+                        found += 1
+                        yield m
+                        if found >= max_failures:
+                            return
+                if progress:
+                    progress(done, total)
+        finally:
+            for fut in pending:
+                fut.cancel()
+
+
+def verify(path, reference, workers=None, max_failures=10, shard=1 << 14, library=None, out=sys.stderr):
+    """Run iter_mismatches with a progress line on `out` and return a summary dict."""
+    start = time.perf_counter()
+    last = [0.0]
+
+    def report(done, total):
+        now = time.perf_counter()
+        if now - last[0] < 1.0 and done < total:
+            return
+        last[0] = now
+        rate = done / max(now - start, 1e-9)
+        out.write(f"\r{done}/{total} vectors ({100.0 * done / total:.1f}%), {rate:,.0f} vectors/s")
+        out.flush()
+
+    mismatches = []
+    for m in iter_mismatches(path, reference, workers, max_failures, shard, library, report if out else None):
+        mismatches.append(m)
+        if out:
+            out.write(f"\nmismatch: inputs={m[0]} got={m[1]} expected={m[2]}\n")
+    elapsed = time.perf_counter() - start
+    if out:
+        out.write("\n")
+    return {"ok": not mismatches, "mismatches": mismatches, "seconds": elapsed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exhaustively compare a composite against a reference composite.")
+    parser.add_argument("composite")
+    parser.add_argument("reference")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--max-failures", type=int, default=10)
+    parser.add_argument("--shard", type=int, default=1 << 14)
+    args = parser.parse_args()
+
+    result = verify(args.composite, args.reference, args.workers, args.max_failures, args.shard)
+    print("PASS" if result["ok"] else f"FAIL ({len(result['mismatches'])} mismatches)", f"in {result['seconds']:.2f}s")
+    sys.exit(0 if result["ok"] else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "txt"))
+
+from compiler import AsmError, assemble, disassemble, pack_digits, unpack_image
+
+
+SOURCE = """
+LOAD R0, 3     -- immediate
+LOAD R9, 2     -- register above 3
+COPY R12, R9
+ADD R0, R9
+STORE R5, R15
+NOT R7
+.DATA 3 3 1 2 0 9
+.DATA 1 3 0 0 2 7   -- NOT with its unused B field set
+HLT
+"""
+
+
+def test_round_trip():
+    code = assemble(SOURCE)
+    assert len(code) == 9 * 6
+    assert max(code) > 3
+    text = "\n".join(line for _, _, line in disassemble(code))
+    assert assemble(text) == code
+
+
+def test_round_trip_digits_and_data_lines():
+    code = assemble(SOURCE)
+    lines = list(disassemble(code))
+    assert [addr for addr, _, _ in lines] == list(range(0, len(code), 6))
+    assert [bytes(digits) for _, digits, _ in lines] == [bytes(code[i:i + 6]) for i in range(0, len(code), 6)]
+    assert lines[1][2] == "LOAD R9, 2"
+    assert lines[6][2] == ".DATA 3 3 1 2 0 9"
+    assert lines[7][2] == ".DATA 1 3 0 0 2 7"
+
+
+@pytest.mark.parametrize("source, lineno", [
+    ("LOAD R0, 1\nFOO R1\nHLT\n", 2),
+    ("-- comment\n\nLOAD R0, 1\nADD R0\n", 4),
+    ("HLT\n.DATA 1 2 3\n", 2),
+    ("LOAD 0, 1\n", 1),
+    ("LOAD R0, 1\nLOAD R1, 300\n", 2),
+])
+def test_error_line_numbers(source, lineno):
+    with pytest.raises(AsmError) as err:
+        assemble(source)
+    assert err.value.lineno == lineno
+    assert str(err.value).startswith(f"line {lineno}:")
+
+
+def test_image_entry_beyond_16_bits():
+    digits = [3, 0, 2, 1, 1]
+    entry, data = unpack_image(pack_digits(digits, entry=70000))
+    assert entry == 70000
+    assert list(data) == digits
@@ -0,0 +1,137 @@
+import itertools
+import json
+
+import pytest
+
+from sim import LevelizedSim, userInput
+from sim.chip import COMPOSITE, NOT, flatten_spec, load_composite_from_json
+from sim.generate import random_dag
+
+
+def _outputs(composite, values):
+    composite._in[:len(values)] = values
+    composite.run()
+    return list(composite._out)
+
+
+def test_lazy_table_fills_on_use():
+    spec = random_dag(30, inputs=4, seed=1)
+    ref = LevelizedSim(spec)
+    composite = COMPOSITE(spec, memo="lazy")
+    assert composite._table == [None] * 256
+    assert _outputs(composite, [1, 2, 3, 0]) == ref.run([1, 2, 3, 0])
+    assert _outputs(composite, [1, 2, 3, 0]) == ref.run([1, 2, 3, 0])
+    assert (composite.memo_misses, composite.memo_hits) == (1, 1)
+    assert sum(row is not None for row in composite._table) == 1
+
+
+def test_eager_table_matches_reference():
+    spec = random_dag(30, inputs=3, seed=2)
+    ref = LevelizedSim(spec)
+    composite = COMPOSITE(spec, memo="eager")
+    assert None not in composite._table
+    for values in itertools.product(range(4), repeat=3):
+        assert _outputs(composite, list(values)) == ref.run(values)
+    assert (composite.memo_misses, composite.memo_hits) == (0, 64)
+
+
+def test_lru_evicts_least_recently_used():
+    spec = random_dag(30, inputs=9, seed=3)
+    ref = LevelizedSim(spec)
+    composite = COMPOSITE(spec, memo="lazy", memo_size=2)
+    assert composite._table is None
+    a, b, c = [0] * 9, [1] * 9, [2] * 9
+    for values in (a, b, a, c):
+        assert _outputs(composite, values) == ref.run(values)
+    # a was used again after b, so c pushed b out.
+    assert list(composite._lru) == [tuple(a), tuple(c)]
+    assert (composite.memo_misses, composite.memo_hits) == (3, 1)
+    _outputs(composite, b)
+    assert composite.memo_misses == 4
+
+
+def test_memoized_composite_drives_push_network():
+    spec = {
+        "nodes": [{"id": "g", "type": "AND"}],
+        "connections": [],
+        "interface_inputs": [{"chip_id": "g", "label": "A"}, {"chip_id": "g", "label": "B"}],
+        "interface_outputs": [{"chip_id": "g", "label": "0", "out_label": "A"}],
+    }
+    composite = COMPOSITE(spec, memo="eager")
+    inverter = NOT()
+    composite.addConnection(inverter, "A", "0")
+    a, b = userInput(), userInput()
+    a.connectTo(composite, "0")
+    b.connectTo(composite, "1")
+    a.run(2)
+    for value in range(4):
+        b.run(value)
+        assert inverter.outputs["A"] == 3 - min(2, value)
+
+
+def _nand():
+    return {
+        "nodes": [{"id": "a", "type": "AND"}, {"id": "n", "type": "NOT"}],
+        "connections": [{"src_id": "a", "src_label": "A", "dst_id": "n", "dst_label": "A"}],
+        "interface_inputs": [{"chip_id": "a", "label": "A"}, {"chip_id": "a", "label": "B"}],
+        "interface_outputs": [{"chip_id": "n", "label": "0", "out_label": "A"}],
+    }
+
+
+def _wrap(child, ref_key="ref"):
+    # NOT(child(x, y)), with the child referenced by name, path or inline.
+    return {
+        "nodes": [{"id": "c", "type": "COMPOSITE", ref_key: child}, {"id": "n", "type": "NOT"}],
+        "connections": [{"src_id": "c", "src_label": "0", "dst_id": "n", "dst_label": "A"}],
+        "interface_inputs": [{"chip_id": "c", "label": "0"}, {"chip_id": "c", "label": "1"}],
+        "interface_outputs": [{"chip_id": "n", "label": "0", "out_label": "A"}],
+    }
+
+
+def _truth(spec):
+    sim = LevelizedSim(spec)
+    return [sim.run(v)[0] for v in itertools.product(range(4), repeat=2)]
+
+
+AND_TABLE = [min(a, b) for a, b in itertools.product(range(4), repeat=2)]
+
+
+def test_flatten_two_levels(tmp_path):
+    (tmp_path / "nand.json").write_text(json.dumps(_nand()))
+    (tmp_path / "and2.json").write_text(json.dumps(_wrap("nand")))
+    spec = _wrap("and2")
+    flat = flatten_spec(spec, str(tmp_path))
+    assert sorted(n["id"] for n in flat["nodes"]) == ["c/c/a", "c/c/n", "c/n", "n"]
+    assert all(n["type"] != "COMPOSITE" for n in flat["nodes"])
+    assert _truth(flat) == [3 - v for v in AND_TABLE]
+    composite = load_composite_from_json(str(tmp_path / "and2.json"))
+    assert [_outputs(composite, list(v))[0] for v in itertools.product(range(4), repeat=2)] == AND_TABLE
+
+
+def test_flatten_inline_spec():
+    assert _truth(flatten_spec(_wrap(_nand(), "spec"))) == AND_TABLE
+
+
+def test_library_before_file_next_to_parent(tmp_path):
+    # The file next to the parent is an AND; the library entry of the same
+    # name is a NAND and wins.
+    (tmp_path / "gate.json").write_text(json.dumps(_wrap(_nand(), "spec")))
+    assert _truth(flatten_spec(_wrap("gate"), str(tmp_path))) == [3 - v for v in AND_TABLE]
+    assert _truth(flatten_spec(_wrap("gate"), str(tmp_path), {"gate": _nand()})) == AND_TABLE
+
+
+def test_child_refs_resolve_next_to_child_file(tmp_path):
+    sub = tmp_path / "sub"
+    sub.mkdir()
+    (sub / "nand.json").write_text(json.dumps(_nand()))
+    (sub / "and2.json").write_text(json.dumps(_wrap("nand")))
+    assert _truth(flatten_spec(_wrap("sub/and2"), str(tmp_path))) == [3 - v for v in AND_TABLE]
+
+
+def test_self_inclusion_raises(tmp_path):
+    (tmp_path / "a.json").write_text(json.dumps(_wrap("b")))
+    (tmp_path / "b.json").write_text(json.dumps(_wrap("a")))
+    with pytest.raises(ValueError, match="includes itself"):
+        flatten_spec(_wrap("a"), str(tmp_path))
+    with pytest.raises(ValueError, match="includes itself"):
+        flatten_spec(_wrap("loop"), library={"loop": _wrap("loop")})
@@ -0,0 +1,75 @@
+import itertools
+import random
+
+import pytest
+
+from sim import CycleSim
+from sim.chip import COMPOSITE
+
+
+def _spec(nodes, connections, inputs, outputs):
+    return {
+        "nodes": [dict(id=nid, type=t, **extra) for nid, t, extra in nodes],
+        "connections": [
+            {"src_id": s, "src_label": sl, "dst_id": d, "dst_label": dl} for s, sl, d, dl in connections
+        ],
+        "interface_inputs": [{"chip_id": c, "label": l} for c, l in inputs],
+        "interface_outputs": [{"chip_id": c, "label": str(i), "out_label": l} for i, (c, l) in enumerate(outputs)],
+    }
+
+
+SPECS = {
+    # Unconnected CLK: a toggle that loads every cycle, starting from init.
+    "toggle": _spec(
+        [("r", "REG", {"init": 1}), ("n", "NOT", {})],
+        [("r", "A", "n", "A"), ("n", "A", "r", "D")],
+        [],
+        [("r", "A")],
+    ),
+    # D unconnected: the register only ever shows its init value.
+    "init_only": _spec(
+        [("r", "REG", {"init": 2}), ("n", "NOT", {})],
+        [("r", "A", "n", "A")],
+        [],
+        [("r", "A"), ("n", "A")],
+    ),
+    # Connected CLK acts as a load enable; D and CLK from the interface.
+    "enable": _spec(
+        [("r", "REG", {"init": 3}), ("a", "AND", {})],
+        [("r", "A", "a", "A")],
+        [("r", "D"), ("r", "CLK"), ("a", "B")],
+        [("r", "A"), ("a", "A")],
+    ),
+    # Accumulator: r <= max(r, x) with the register's CLK left open.
+    "accumulate": _spec(
+        [("r", "REG", {}), ("s", "SPLIT", {"outputs": ["A", "B"]}), ("o", "OR", {})],
+        [("r", "A", "s", "A"), ("s", "A", "o", "A"), ("o", "A", "r", "D")],
+        [("o", "B")],
+        [("s", "B")],
+    ),
+}
+
+
+@pytest.mark.parametrize("name", sorted(SPECS))
+def test_push_matches_cycle(name):
+    spec = SPECS[name]
+    k = len(spec["interface_inputs"])
+    push = COMPOSITE(spec)
+    cycle = CycleSim(spec)
+    r = random.Random(0)
+    vectors = [tuple(r.randrange(4) for _ in range(k)) for _ in range(40)]
+    vectors += list(itertools.product(range(4), repeat=k))
+    for v in vectors:
+        push._in[:k] = v
+        push.run()
+        assert push._out[:len(spec["interface_outputs"])] == cycle.step(v), v
+
+
+def test_unconnected_clk_loads_and_init_is_visible():
+    push = COMPOSITE(SPECS["toggle"])
+    seen = []
+    for _ in range(4):
+        push.run()
+        seen.append(push._out[0])
+    assert seen == [1, 2, 1, 2]
+    assert CycleSim(SPECS["toggle"]).run_cycles(4) == [2]
@@ -0,0 +1,104 @@
+import random
+
+import numpy as np
+import pytest
+
+from sim import BitSliceSim, EventSim, LevelizedSim
+from sim.batch import UNSET, BatchSim
+from sim.bitslice import pack, unpack
+from sim.chip import COMPOSITE
+from sim.codegen import compile_spec
+from sim.generate import adder_array, layered, random_dag
+
+
+def _push(spec, vectors):
+    composite = COMPOSITE(spec)
+    out = []
+    for vec in vectors:
+        composite._in[:len(vec)] = vec
+        composite.run()
+        out.append(list(composite._out))
+    return out
+
+
+def _event(spec, vectors):
+    # One simulator for every vector, so each run starts from the last state.
+    sim = EventSim(spec, delays={"AND": 1, "OR": 2, "NOT": 1, "SPLIT": 0})
+    return [sim.run(vec) for vec in vectors]
+
+
+def _batch(spec, vectors):
+    out = BatchSim(spec, chunk=32).run(np.array(vectors, dtype=np.uint8).reshape(len(vectors), -1))
+    return [[None if v == UNSET else int(v) for v in row] for row in out]
+
+
+def _compiled(spec, vectors):
+    fn = compile_spec(spec)
+    return [list(fn(*vec)) for vec in vectors]
+
+
+ENGINES = {
+    "push": _push,
+    "event": _event,
+    "batch": _batch,
+    "bitslice": lambda spec, vectors: BitSliceSim(spec, width=16).run(vectors),
+    "compiled": _compiled,
+}
+
+# An AND with one pin left open drives output 0, which stays undriven.
+UNDRIVEN = {
+    "nodes": [{"id": "a", "type": "AND"}, {"id": "n", "type": "NOT"}, {"id": "s", "type": "SPLIT", "outputs": ["A", "B"]}],
+    "connections": [
+        {"src_id": "s", "src_label": "A", "dst_id": "a", "dst_label": "A"},
+        {"src_id": "s", "src_label": "B", "dst_id": "n", "dst_label": "A"},
+    ],
+    "interface_inputs": [{"chip_id": "s", "label": "A"}],
+    "interface_outputs": [
+        {"chip_id": "a", "label": "0", "out_label": "A"},
+        {"chip_id": "n", "label": "1", "out_label": "A"},
+    ],
+}
+
+# Kept small: the push model re-fires a gate's whole cone on every
+# input change, which grows quickly with reconvergent fanout.
+SPECS = {
+    "layered": layered(40, depth=5, inputs=6, seed=1),
+    "random_dag": random_dag(30, inputs=8, window=10, seed=2),
+    "adder_array": adder_array(2, 2),
+    "undriven": UNDRIVEN,
+}
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("name", SPECS)
+def test_engine_matches_levelized(name, engine):
+    spec = SPECS[name]
+    k = len(spec["interface_inputs"])
+    r = random.Random(name)
+    vectors = [[r.randrange(4) for _ in range(k)] for _ in range(100)]
+    ref = LevelizedSim(spec)
+    assert ENGINES[engine](spec, vectors) == [ref.run(vec) for vec in vectors]
+
+
+def test_undriven_outputs():
+    assert LevelizedSim(UNDRIVEN).run([2]) == [None, 1]
+    assert BatchSim(UNDRIVEN).run([[2]]).tolist() == [[UNSET, 1]]
+
+
+@pytest.mark.parametrize("count, width", [(0, 64), (1, 64), (64, 64), (5, 8)])
+def test_pack_unpack_round_trip(count, width):
+    r = random.Random(count)
+    vectors = [[r.randrange(4) for _ in range(3)] for _ in range(count)]
+    planes = pack(vectors, width)
+    assert all(p[0] < 1 << width and p[1] < 1 << width for p in planes)
+    assert unpack(planes, count) == vectors
+
+
+def test_unpack_undriven_plane():
+    planes = pack([[1, 2], [3, 0]])
+    assert unpack([planes[0], None], 2) == [[1, None], [3, None]]
+
+
+def test_pack_refuses_too_many_vectors():
+    with pytest.raises(ValueError):
+        pack([[0]] * 9, width=8)
@@ -0,0 +1,37 @@
+import pytest
+
+from sim import LevelizedSim
+from sim.generate import layered, random_dag, adder_array
+
+
+@pytest.mark.parametrize("gates, depth, inputs", [
+    (64, 16, 32),
+    (20, 10, 16),
+    (1000, 16, 32),
+    (300, 4, 100),
+])
+def test_layered_keeps_every_input(gates, depth, inputs):
+    spec = layered(gates, depth=depth, inputs=inputs)
+    assert len(spec["interface_inputs"]) == inputs
+    assert len([n for n in spec["nodes"] if n["type"] != "SPLIT"]) == gates
+    LevelizedSim(spec).run([1] * inputs)
+
+
+def test_random_dag_keeps_every_input():
+    assert len(random_dag(40, inputs=32)["interface_inputs"]) == 32
+
+
+def test_too_few_gates_for_inputs_raises():
+    with pytest.raises(ValueError):
+        layered(4, depth=2, inputs=32, mix={"NOT": 1})
+
+
+def test_adder_array_inputs():
+    assert len(adder_array(4, 2)["interface_inputs"]) == 4 * 3 + 2
+
+
+@pytest.mark.parametrize("bits, rows", [(1, 1), (4, 2), (8, 4)])
+def test_adder_array_size(bits, rows):
+    nodes = adder_array(bits, rows)["nodes"]
+    assert len(nodes) == 17 * bits * rows
+    assert len([n for n in nodes if n["type"] != "SPLIT"]) == 13 * bits * rows
@@ -0,0 +1,98 @@
+import itertools
+
+import pytest
+
+from sim import LevelizedSim
+from sim.chip import REGISTRY, register
+from sim.chip.registry import chip_type
+from sim.core import Chip
+from sim.optimize import optimize_spec
+
+
+class MUX(Chip):
+    """S ? Y : X, a three-input gate whose operands can not be swapped."""
+    __slots__ = ()
+    IN_LABELS = ("X", "Y", "S")
+    OUT_LABELS = ("Q",)
+
+    @staticmethod
+    def _mux(x, y, s):
+        return y if s > 1 else x
+
+
+@pytest.fixture
+def mux():
+    register("MUX", MUX, kernel=MUX._mux)
+    yield chip_type("MUX")
+    del REGISTRY["MUX"]
+
+
+def _mux_spec(swap):
+    # Two MUXes reading the wires x, y and s through SPLITs; with `swap`
+    # the second one has X and Y exchanged. Interface pins are listed in an
+    # order that differs from the registered pin order.
+    def wire(src, dst, lbl):
+        return {"src_id": src, "src_label": "B" if dst == "m2" else "A", "dst_id": dst, "dst_label": lbl}
+
+    second = {"X": "y", "Y": "x"} if swap else {"X": "x", "Y": "y"}
+    return {
+        "nodes": [{"id": w, "type": "SPLIT", "outputs": ["A", "B"]} for w in "xys"] + [
+            {"id": "m1", "type": "MUX"}, {"id": "m2", "type": "MUX"}, {"id": "o", "type": "OR"}],
+        "connections": [wire("s", "m1", "S"), wire("y", "m1", "Y"), wire("x", "m1", "X"),
+                        wire("s", "m2", "S"), wire(second["Y"], "m2", "Y"), wire(second["X"], "m2", "X"),
+                        {"src_id": "m1", "src_label": "Q", "dst_id": "o", "dst_label": "A"},
+                        {"src_id": "m2", "src_label": "Q", "dst_id": "o", "dst_label": "B"}],
+        "interface_inputs": [{"chip_id": w, "label": "A"} for w in "sxy"],
+        "interface_outputs": [
+            {"chip_id": "m1", "label": "0", "out_label": "Q"},
+            {"chip_id": "o", "label": "1", "out_label": "A"},
+        ],
+    }
+
+
+def _same_outputs(spec, new_spec, k):
+    before, after = LevelizedSim(spec), LevelizedSim(new_spec)
+    for v in itertools.product(range(4), repeat=k):
+        assert after.run(v) == before.run(v)
+
+
+def test_non_commutative_permuted_inputs_are_not_merged(mux):
+    spec = _mux_spec(swap=True)
+    new_spec, stats = optimize_spec(spec)
+    assert stats["cse"] == 0
+    assert sorted(n["id"] for n in new_spec["nodes"] if n["type"] == "MUX") == ["m1", "m2"]
+    _same_outputs(spec, new_spec, 3)
+
+
+def test_non_commutative_identical_inputs_are_merged(mux):
+    spec = _mux_spec(swap=False)
+    new_spec, stats = optimize_spec(spec)
+    assert stats["cse"] == 1
+    assert [n["id"] for n in new_spec["nodes"] if n["type"] == "MUX"] == ["m1"]
+    _same_outputs(spec, new_spec, 3)
+
+
+def test_commutative_gates_still_merge():
+    # AND(x, y) and AND(y, x), with x and y fanned out through SPLITs.
+    spec = {
+        "nodes": [
+            {"id": "s0", "type": "SPLIT", "outputs": ["A", "B"]},
+            {"id": "s1", "type": "SPLIT", "outputs": ["A", "B"]},
+            {"id": "a", "type": "AND"},
+            {"id": "b", "type": "AND"},
+            {"id": "o", "type": "OR"},
+        ],
+        "connections": [
+            {"src_id": "s0", "src_label": "A", "dst_id": "a", "dst_label": "A"},
+            {"src_id": "s1", "src_label": "A", "dst_id": "a", "dst_label": "B"},
+            {"src_id": "s1", "src_label": "B", "dst_id": "b", "dst_label": "A"},
+            {"src_id": "s0", "src_label": "B", "dst_id": "b", "dst_label": "B"},
+            {"src_id": "a", "src_label": "A", "dst_id": "o", "dst_label": "A"},
+            {"src_id": "b", "src_label": "A", "dst_id": "o", "dst_label": "B"},
+        ],
+        "interface_inputs": [{"chip_id": "s0", "label": "A"}, {"chip_id": "s1", "label": "A"}],
+        "interface_outputs": [{"chip_id": "o", "label": "0", "out_label": "A"}],
+    }
+    new_spec, stats = optimize_spec(spec)
+    assert stats["cse"] == 1
+    _same_outputs(spec, new_spec, 2)
@@ -0,0 +1,32 @@
+from sim import Profiler
+from sim.chip import AND, NOT, REG
+
+
+def test_pushes_counted_only_when_propagating():
+    gate = AND()
+    a, b = NOT(), NOT()
+    gate.addConnection(a, "A", "A")
+    gate.addConnection(b, "A", "A")
+    reg = REG()
+    reg.addConnection(NOT(), "A", "A")
+
+    with Profiler() as prof:
+        gate._in[0] = 2
+        gate.run()
+        reg.run()
+        assert prof.fanout.get(id(gate), 0) == 0
+        assert prof.fanout.get(id(reg), 0) == 0
+
+        gate._in[1] = 1
+        gate.run()
+    assert prof.fanout[id(gate)] == 2
+    assert prof.counts[id(gate)] == 2
+    assert [name for name, _ in prof.hot_spots()] == ["AND#0"]
+
+
+def test_disable_restores_chip_run():
+    from sim.core import Chip
+    base = Chip.__dict__["run"]
+    with Profiler():
+        assert Chip.__dict__["run"] is not base
+    assert Chip.__dict__["run"] is base
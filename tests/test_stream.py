@@ -0,0 +1,41 @@
+import io
+import json
+
+from sim.chip import load_composite_from_json
+from sim.generate import adder_array
+from sim.stream import main, read_vectors, stream
+
+
+def _spec_file(tmp_path):
+    path = tmp_path / "adder.json"
+    path.write_text(json.dumps(adder_array(2, 1)))
+    return str(path)
+
+
+def test_compiled_load_builds_no_chips(tmp_path):
+    composite = load_composite_from_json(_spec_file(tmp_path), engine="compiled")
+    assert composite._nodes == {}
+    composite._in[:5] = (3, 0, 0, 3, 0)
+    composite.run()
+    assert composite._out[:3] == [3, 3, 0]
+
+
+def test_engines_agree(tmp_path):
+    path = _spec_file(tmp_path)
+    source = "\n".join(",".join(str((i >> b) & 1 and 3) for b in range(5)) for i in range(32))
+    outputs = {}
+    for engine in ("compiled", "batch", "push", "levelized"):
+        composite = load_composite_from_json(path, engine="compiled" if engine in ("compiled", "batch") else engine)
+        out = io.StringIO()
+        n = stream(composite, read_vectors(io.StringIO(source), "csv", 5), out, "ndjson", engine, chunk=7)
+        assert n == 32
+        outputs[engine] = out.getvalue()
+    assert len(set(outputs.values())) == 1
+
+
+def test_header_columns_are_distinct(tmp_path, capsys, monkeypatch):
+    path = _spec_file(tmp_path)
+    monkeypatch.setattr("sys.stdin", io.StringIO("0,0,0,0,0\n"))
+    main([path, "--header", "-q"])
+    header = capsys.readouterr().out.splitlines()[0].split(",")
+    assert header == ["0", "1", "2"]
@@ -0,0 +1,106 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "txt"))
+
+import txt
+
+
+def _lockstep(tmp_path, monkeypatch, source):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "code.asm").write_text(source)
+    txt.PC("lockstep")
+
+
+def test_lockstep_basic(tmp_path, monkeypatch):
+    _lockstep(tmp_path, monkeypatch, "LOAD R0, 1\nLOAD R1, 1\nADD R0, R1\nHLT\n")
+
+
+@pytest.mark.parametrize("reg", [4, 5, 9])
+def test_lockstep_registers_above_3(tmp_path, monkeypatch, reg):
+    # Operand digits above 3 are stored as-is but read back clamped to 3.
+    _lockstep(tmp_path, monkeypatch, f"LOAD R{reg}, 2\nLOAD R1, 1\nADD R{reg}, R1\nCOPY R0, R{reg}\nHLT\n")
+
+
+def _tree_state(ram):
+    return [(cell.inValue.inValue, cell.inLock.inValue) for cell in map(ram._cell, range(64))]
+
+
+def test_tree_load_matches_per_digit_writes():
+    digits = [(7 * i) % 5 for i in range(60)]
+    loaded = txt.RAM3()
+    loaded.load_digits(digits, entry=6)
+    written = txt.RAM3()
+    for addr, val in enumerate(digits):
+        written._run(addr % 4, (addr // 4) % 4, addr // 16, 3, val)
+    written._set_address(6)
+    assert _tree_state(loaded) == _tree_state(written)
+    assert loaded.address() == 6
+    assert [loaded.fetch() for _ in range(5)] == [written.fetch() for _ in range(5)]
+
+
+def test_tree_cache_dropped_on_write():
+    ram = txt.RAM3()
+    ram.load_digits([2, 0, 1, 2, 3, 0])
+    assert ram.fetch() == (2, 0, 1, 2, 3, 0)
+    assert 0 in ram.cache
+    ram._set_address(0)
+    ram.run(2, 0, 0, 3, 3)
+    assert ram.cache == {}
+    assert ram.fetch() == (2, 0, 3, 2, 3, 0)
+
+
+def test_tree_cache_matches_uncached():
+    import random
+
+    rng = random.Random(14)
+    cached, plain = txt.RAM3(), txt.RAM3(cache=False)
+    digits = [rng.randrange(4) for _ in range(64)]
+    cached.load_digits(digits)
+    plain.load_digits(digits)
+    for _ in range(500):
+        if rng.random() < 0.3:
+            args = (rng.randrange(4), rng.randrange(4), rng.randrange(4), rng.randrange(1, 4), rng.randrange(4))
+            cached.run(*args)
+            plain.run(*args)
+        else:
+            if rng.random() < 0.2:
+                addr = rng.randrange(64)
+                cached._set_address(addr)
+                plain._set_address(addr)
+            assert cached.fetch() == plain.fetch()
+            assert cached.address() == plain.address()
+    assert _tree_state(cached) == _tree_state(plain)
+
+
+@pytest.mark.parametrize("make", [txt.RG16Array, txt.RAM3Array, lambda: txt.PagedStore(64), lambda: txt.RAMN(3)])
+def test_ranges_outside_store_raise(make):
+    store = make()
+    size = len(store.cells) if hasattr(store, "cells") else len(store)
+    store.write_range(size - 2, [1, 2])
+    assert store.read_range(size - 2, 2) == [1, 2]
+    with pytest.raises(ValueError):
+        store.write_range(size - 2, [1, 2, 3])
+    with pytest.raises(ValueError):
+        store.read_range(-1, 2)
+    with pytest.raises(ValueError):
+        store.read_range(size - 1, 2)
+
+
+def test_tree_write_range_refuses_overflow():
+    ram = txt.RAM3()
+    ram.write_range(62, [1, 2])
+    with pytest.raises(ValueError):
+        ram.write_range(62, [1, 2, 3])
+    assert _tree_state(ram)[0] == (0, 0)
+
+
+def test_stale_image_is_rebuilt(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "code.asm").write_text("LOAD R0, 1\nHLT\n")
+    # A 16-bit-entry image from before the header change, newer than the source.
+    (tmp_path / "code.qimg").write_bytes(b"QIMG\x00\x00\x0c\x00\x00\x00" + bytes(3))
+    entry, digits = txt._program()
+    assert (entry, list(digits)) == (0, [2, 0, 0, 2, 0, 1, 2, 3, 0, 0, 0, 0])
@@ -0,0 +1,30 @@
+import json
+
+from sim.verify import iter_mismatches
+
+
+SPEC = {
+    "nodes": [{"id": "a", "type": "AND"}, {"id": "o", "type": "OR"}],
+    "connections": [{"src_id": "a", "src_label": "A", "dst_id": "o", "dst_label": "A"}],
+    "interface_inputs": [
+        {"chip_id": "a", "label": "A"},
+        {"chip_id": "a", "label": "B"},
+        {"chip_id": "o", "label": "B"},
+    ],
+    "interface_outputs": [{"chip_id": "o", "label": "0", "out_label": "A"}],
+}
+
+
+def _wrong(a, b, c):
+    # Differs from max(min(a, b), c) whenever c is 0 and min(a, b) is not.
+    return (max(min(a, b), c) if c else 0,)
+
+
+def test_pool_reports_first_failures_in_vector_order(tmp_path):
+    path = tmp_path / "c.json"
+    path.write_text(json.dumps(SPEC))
+    serial = list(iter_mismatches(str(path), _wrong, workers=1, max_failures=3, shard=2))
+    pooled = list(iter_mismatches(str(path), _wrong, workers=4, max_failures=3, shard=2))
+    assert len(serial) == 3
+    assert pooled == serial
+    assert [m[0] for m in serial] == sorted(m[0] for m in serial)
@@ -1,4 +1,199 @@
-def compile_asm(asm_code):
+import mmap
+import struct
+
+
+# Program image: 4-byte magic, entry point and length in digits (both
+# 32-bit little-endian), then the digits packed four to a byte, first
+# digit in the high bits.
+IMAGE_MAGIC = b"QIM2"
+IMAGE_HEADER = struct.Struct("<4sII")
+
+_UNPACK = [bytes(((b >> 6) & 3, (b >> 4) & 3, (b >> 2) & 3, b & 3)) for b in range(256)]
+
+
+def pack_image(machine_code, entry=0):
+    return pack_digits([val for instr in machine_code for val in instr], entry)
+
+
+def pack_digits(digits, entry=0):
+    # RAM reads clamp every cell to 3, so operands above 3 pack as 3.
+    length = len(digits)
+    digits = [min(val, 3) for val in digits]
+    if digits and min(digits) < 0:
+        raise ValueError("Program image digits can not be negative")
+    digits += [0] * (-length % 4)
+    body = bytes(
+        (digits[i] << 6) | (digits[i + 1] << 4) | (digits[i + 2] << 2) | digits[i + 3]
+        for i in range(0, len(digits), 4)
+    )
+    return IMAGE_HEADER.pack(IMAGE_MAGIC, entry, length) + body
+
+
+def unpack_image(data):
+    """Return (entry, digits) for an image held in any buffer, digits as bytes."""
+    if len(data) < IMAGE_HEADER.size:
+        raise ValueError("Program image is truncated")
+    magic, entry, length = IMAGE_HEADER.unpack_from(data)
+    if magic != IMAGE_MAGIC:
+        raise ValueError("Not a program image")
+    end = IMAGE_HEADER.size + (length + 3) // 4
+    if len(data) < end:
+        raise ValueError("Program image is truncated")
+    digits = b"".join([_UNPACK[b] for b in data[IMAGE_HEADER.size:end]])
+    return entry, digits[:length]
+
+
+def load_image(path):
+    with open(path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return unpack_image(data)
+
+
+INSTRUCTIONS = {
+    'ADD':   (0, 0),
+    'SUB':   (0, 1),
+    'MUL':   (0, 2),
+    'DIV':   (0, 3),
+    'MIN':   (1, 0),
+    'MAX':   (1, 1),
+    'MOD':   (1, 2),
+    'NOT':   (1, 3),
+    'LOAD':  (2, 0),
+    'STORE': (2, 1),
+    'COPY':  (2, 2),
+    'HLT':   (2, 3),
+}
+
+MNEMONICS = {code: op for op, code in INSTRUCTIONS.items()}
+
+# Operand layout per instruction: (RNF0, RNF1, operands in source order).
+# Each operand is (field, kind): field "a" or "b" of the encoding, kind
+# "R" for a register written R<n> or "#" for an immediate.
+#   LOAD  R(A) Imm
+#   COPY  R(B) R(A)      R(B) = R(A)
+#   STORE R(A) R(B)
+#   OP    R(A) R(B)      R(A) = R(A) OP R(B)
+#   NOT   R(A)
+_BINARY = (0, 0, (("a", "R"), ("b", "R")))
+
+OPERANDS = {
+    'ADD':   _BINARY,
+    'SUB':   _BINARY,
+    'MUL':   _BINARY,
+    'DIV':   _BINARY,
+    'MIN':   _BINARY,
+    'MAX':   _BINARY,
+    'MOD':   _BINARY,
+    'NOT':   (0, 0, (("a", "R"),)),
+    'LOAD':  (0, 2, (("a", "R"), ("b", "#"))),
+    'STORE': _BINARY,
+    'COPY':  (0, 0, (("b", "R"), ("a", "R"))),
+    'HLT':   (0, 0, ()),
+}
+
+# Raw digits that do not decode to an instruction are written as data.
+DATA = '.DATA'
+
+
+class AsmError(ValueError):
+    def __init__(self, lineno, message):
+        super().__init__(f"line {lineno}: {message}")
+        self.lineno = lineno
+
+
+def _operand(text, kind, lineno):
+    if kind == "R":
+        if text[:1] not in ("R", "r"):
+            raise AsmError(lineno, f"Expected a register, got {text!r}")
+        text = text[1:]
+    if not text.isdigit():
+        raise AsmError(lineno, f"Expected a number, got {text!r}")
+    return int(text)
+
+
+def _parse(line, lineno):
+    line = line.split('--')[0].strip()  # Remove comments
+    if not line:
+        return None
+
+    parts = line.replace(',', ' ').split()
+    op = parts[0].upper()
+    args = parts[1:]
+
+    if op == DATA:
+        if len(args) != 6:
+            raise AsmError(lineno, f"{DATA} takes 6 digits, got {len(args)}")
+        return tuple(_operand(arg, "#", lineno) for arg in args)
+
+    if op not in INSTRUCTIONS:
+        raise AsmError(lineno, f"Unknown instruction: {op}")
+
+    rnf0, rnf1, operands = OPERANDS[op]
+    if len(args) != len(operands):
+        raise AsmError(lineno, f"{op} takes {len(operands)} operands, got {len(args)}")
+    fields = {"a": 0, "b": 0}
+    for (field, kind), arg in zip(operands, args):
+        fields[field] = _operand(arg, kind, lineno)
+
+    return INSTRUCTIONS[op] + (rnf0, rnf1, fields["a"], fields["b"])
+
+
+def iter_asm(source):
+    """
+    Assemble line by line. `source` is a string, an open file or any
+    iterable of lines; yields (line number, 6-digit instruction) without
+    holding the rest of the program in memory.
+    """
+    if isinstance(source, str):
+        source = source.split('\n')
+    for lineno, line in enumerate(source, 1):
+        instr = _parse(line, lineno)
+        if instr is not None:
+            yield lineno, instr
+
+
+def assemble(source, out=None):
+    """
+    Stream machine code into `out` (a bytearray or array('B'), created
+    when omitted) and return it. The buffer is not packed: it holds one
+    byte per digit, six per instruction, so operands above 3 survive.
+    pack_digits turns digits into the 2-bit program image.
+    """
+    if out is None:
+        out = bytearray()
+    for lineno, instr in iter_asm(source):
+        if max(instr) > 255:
+            raise AsmError(lineno, f"Operand does not fit in a byte: {max(instr)}")
+        out.extend(instr)
+    return out
+
+
+def _format(instr):
+    op = MNEMONICS.get(tuple(instr[:2]))
+    if op is not None:
+        rnf0, rnf1, operands = OPERANDS[op]
+        fields = {"a": instr[4], "b": instr[5]}
+        used = {field for field, _ in operands}
+        if (instr[2], instr[3]) == (rnf0, rnf1) and all(fields[f] == 0 for f in "ab" if f not in used):
+            args = [("R" if kind == "R" else "") + str(fields[field]) for field, kind in operands]
+            return f"{op} {', '.join(args)}".rstrip()
+    return f"{DATA} {' '.join(str(d) for d in instr)}"
+
+
+def disassemble(code, start=0):
+    """
+    Yield (address, digits, text) for every 6-digit instruction in `code`
+    (any sequence of digits, e.g. the output of assemble). Text assembles
+    back to the same digits; anything that is not a valid encoding comes
+    out as a .DATA line, and a short tail is padded with zeros.
+    """
+    for addr in range(start, len(code), 6):
+        instr = tuple(code[addr:addr + 6])
+        instr += (0,) * (6 - len(instr))
+        yield addr, instr, _format(instr)
+
+
+def compile_asm(asm_code, image=False, entry=0):
     """
     Simple ASM compiler for the 4-bit (base-4) logic system.
     
@@ -16,74 +211,12 @@ def compile_asm(asm_code):
     2: Immediate (None)
     
     A, B: Address (0-15) or Immediate Value (0-3)
+
+    Returns the list of 6-digit instructions, or with image=True the
+    packed program image (see pack_image) starting at `entry`.
     """
-    
-    instructions = {
-        'ADD':   (0, 0),
-        'SUB':   (0, 1),
-        'MUL':   (0, 2),
-        'DIV':   (0, 3),
-        'MIN':   (1, 0),
-        'MAX':   (1, 1),
-        'MOD':   (1, 2),
-        'NOT':   (1, 3),
-        'LOAD':  (2, 0),
-        'STORE': (2, 1),
-        'COPY':  (2, 2),
-        'HLT':   (2, 3),
-    }
-
-    machine_code = []
-    
-    for line in asm_code.split('\n'):
-        line = line.split('--')[0].strip() # Remove comments
-        if not line:
-            continue
-            
-        parts = line.replace(',', ' ').split()
-        op = parts[0].upper()
-        
-        if op not in instructions:
-            raise ValueError(f"Unknown instruction: {op}")
-            
-        instr0, instr1 = instructions[op]
-        rnf0, rnf1, a, b = 0, 0, 0, 0
-        
-        # Parse operands based on instruction type
-        if op == 'HLT':
-            pass
-        elif op == 'LOAD':
-            # LOAD R(A) Imm
-            rnf0 = 0 # Reg
-            rnf1 = 2 # Immediate
-            a = int(parts[1][1:]) # R0 -> 0
-            b = int(parts[2])     # 1 -> 1
-        elif op == 'COPY':
-            # COPY R(B) R(A) -> R(B) = R(A)
-            rnf0 = 0
-            rnf1 = 0
-            a = int(parts[2][1:]) # Source
-            b = int(parts[1][1:]) # Dest
-        elif op == 'STORE':
-            # STORE R(A) R(B)
-            rnf0 = 0
-            rnf1 = 0
-            a = int(parts[1][1:])
-            b = int(parts[2][1:])
-        elif op in ['ADD', 'SUB', 'MUL', 'DIV', 'MIN', 'MAX', 'MOD']:
-            # OP R(Dest) R(Src) -> R(Dest) = R(Dest) OP R(Src)
-            # Our CPU uses A as Dest and B as Src
-            rnf0 = 0
-            rnf1 = 0
-            a = int(parts[1][1:])
-            b = int(parts[2][1:])
-        elif op == 'NOT':
-            # NOT R(A)
-            rnf0 = 0
-            rnf1 = 0
-            a = int(parts[1][1:])
-            b = 0
-            
-        machine_code.append((instr0, instr1, rnf0, rnf1, a, b))
-        
+    machine_code = [instr for _, instr in iter_asm(asm_code)]
+
+    if image:
+        return pack_image(machine_code, entry)
     return machine_code
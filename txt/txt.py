@@ -1,3 +1,6 @@
+import os
+import sys
+
 MIN = min
 MAX = max
 NOT = lambda inA: 3 - inA
@@ -141,13 +144,37 @@ def ROM_INSTR(instr0, instr1):
     return MAX(Q1, 0), 0
 
 
+def _fetch_cells(cells, pc):
+    # One instruction from a flat digit store: ROM_INSTR decodes its
+    # length from the first two digits, every read clamps to 3 like the
+    # RAM tree and the address wraps like the program counter. Returns
+    # the 6-digit instruction and the number of digits it spans.
+    size = len(cells)
+    instr0, instr1 = MIN(cells[pc], 3), MIN(cells[(pc + 1) % size], 3)
+    nx1, nx0 = ROM_INSTR(instr0, instr1)
+    n = 2 + nx0 + 4 * nx1
+    out = [MIN(cells[(pc + k) % size], 3) for k in range(n)]
+    while len(out) < 6:
+        out.append(0)
+
+    return tuple(out[:6]), n
+
+
+def _check_range(start, count, size):
+    if start < 0 or start + count > size:
+        raise ValueError(f"Range {start}..{start + count} is outside {size} cells")
+
+
 class RAM3:
-    def __init__(self):
+    def __init__(self, cache=True):
         self.r0 = RAM2()
         self.r1 = RAM2()
         self.r2 = RAM2()
         self.r3 = RAM2()
         self.C = COUNTER3()
+        # Decoded fetches keyed by program counter address:
+        # address -> (instruction tuple, next address, digits spanned).
+        self.cache = {} if cache else None
 
     def _run(self, Adr0, Adr1, Adr2, Set, Value):
         A, B, C, D = Adr4(Adr2, Set)
@@ -165,6 +192,51 @@ class RAM3:
 
         return MAX(MAX(OUT0, OUT1), MAX(OUT2, OUT3))
 
+    def address(self):
+        return (self.C.c1.inValue.inValue
+                + 4 * self.C.c2.inValue.inValue
+                + 16 * self.C.c3.inValue.inValue)
+
+    def _set_address(self, address):
+        self.C.c1.inValue.inValue = address % 4
+        self.C.c2.inValue.inValue = (address // 4) % 4
+        self.C.c3.inValue.inValue = address // 16
+
+    def _invalidate(self, Adr0, Adr1, Adr2):
+        if not (0 <= Adr0 <= 3 and 0 <= Adr1 <= 3 and 0 <= Adr2 <= 3):
+            return
+        addr = Adr0 + 4 * Adr1 + 16 * Adr2
+        for start, (_, _, span) in list(self.cache.items()):
+            if (addr - start) % 64 < span:
+                del self.cache[start]
+
+    def _cell(self, address):
+        ram2 = (self.r0, self.r1, self.r2, self.r3)[address // 16]
+        ram1 = (ram2.r0, ram2.r1, ram2.r2, ram2.r3)[(address // 4) % 4]
+        return (ram1.m0, ram1.m1, ram1.m2, ram1.m3)[address % 4]
+
+    def write_range(self, start, values):
+        # Same end state as one _run write per cell (value stored, lock
+        # toggled as RM1 does under Set 3) without walking the select tree.
+        values = list(values)
+        _check_range(start, len(values), 64)
+        for addr, val in enumerate(values, start):
+            cell = self._cell(addr)
+            lock = cell.inLock.inValue
+            cell.inLock.inValue = COM(MAX(lock, 3), MIN(lock, 3))
+            cell.inValue.inValue = val
+        if self.cache:
+            self.cache.clear()
+
+    def load_digits(self, digits, entry=0):
+        if len(digits) > 64:
+            raise ValueError(f"Program of {len(digits)} digits does not fit in 64 cells")
+        self.write_range(0, digits)
+        self._set_address(entry % 64)
+
+    def fetch(self):
+        return self.run(0, 0, 0, 0, 0)
+
     def advGet(self, st0, st1, st2, ADR0, ADR1, ADR2):
         val = self._run(ADR0, ADR1, ADR2, 0, 0)
 
@@ -173,11 +245,21 @@ class RAM3:
         return val, ADR01, ADR11, ADR21
 
     def run(self, AD0, AD1, AD2, Set, Var):
-        self._run(AD0, AD1, AD2, Set, Var)
-
+        # A read through the select tree (Set 0) stores nothing, so only
+        # writes walk it here; fetches go through the cache first.
         if Set > 0:
+            self._run(AD0, AD1, AD2, Set, Var)
+            if self.cache:
+                self._invalidate(AD0, AD1, AD2)
             return
 
+        if self.cache is not None:
+            start = self.address()
+            hit = self.cache.get(start)
+            if hit is not None:
+                self._set_address(hit[1])
+                return hit[0]
+
         ADR0, ADR1, ADR2 = self.C.run(0, 0, 0)
 
         instr1, A1, AA1, AAA1 = self.advGet(1, 0, 0, ADR0, ADR1, ADR2)
@@ -191,10 +273,16 @@ class RAM3:
             val, A2, AA2, AAA2 = self.advGet(1, 0, 0, A2, AA2, AAA2)
             TEMP_LIST_TO_BE_REMOVED.append(val)
 
+        span = len(TEMP_LIST_TO_BE_REMOVED)
+
         while len(TEMP_LIST_TO_BE_REMOVED) < 6:
             TEMP_LIST_TO_BE_REMOVED.append(0)
 
-        return tuple(TEMP_LIST_TO_BE_REMOVED[:6])
+        instr = tuple(TEMP_LIST_TO_BE_REMOVED[:6])
+        if self.cache is not None:
+            self.cache[start] = (instr, self.address(), span)
+
+        return instr
 
 
 
@@ -390,6 +478,236 @@ class COUNTER3:
         return val1, val2, val3
 
 
+class COUNTERN:
+    """COUNTER3 widened to `width` digits, least significant first."""
+
+    def __init__(self, width):
+        self.digits = [COUNTER() for _ in range(width)]
+
+    def run(self, *adds):
+        carry = 0
+        out = []
+        for i, c in enumerate(self.digits):
+            carry, val = c.run(MAX(carry, adds[i] if i < len(adds) else 0))
+            out.append(val)
+
+        return tuple(out)
+
+    def address(self):
+        return sum(c.inValue.inValue * 4 ** i for i, c in enumerate(self.digits))
+
+    def _set_address(self, address):
+        for c in self.digits:
+            c.inValue.inValue = address % 4
+            address //= 4
+
+
+class RG16Array:
+    """
+    RG16 with the same run() contract, backed by a bytearray. Register
+    (Adr0, Adr1) is cell 4 * Adr0 + Adr1; an address outside 0..3 selects
+    nothing and reads 0, like the decoder tree.
+    """
+
+    def __init__(self, size=16):
+        self.cells = bytearray(size)
+
+    def run(self, Adr0, Adr1, Set, Value):
+        if not (0 <= Adr0 <= 3 and 0 <= Adr1 <= 3):
+            return 0
+        i = 4 * Adr0 + Adr1
+        if Set > 0:
+            self.cells[i] = Value
+
+        return MIN(self.cells[i], 3)
+
+    def read_range(self, start, count):
+        _check_range(start, count, len(self.cells))
+        return list(self.cells[start:start + count])
+
+    def write_range(self, start, values):
+        values = bytes(values)
+        _check_range(start, len(values), len(self.cells))
+        self.cells[start:start + len(values)] = values
+
+
+def _count3(address, add0, add1, add2):
+    # COUNTER3 on a linear address: three HF_ADDER digits, carry MAXed in.
+    carry1, val1 = HF_ADDER(address % 4, add0)
+    carry2, val2 = HF_ADDER((address // 4) % 4, MAX(carry1, add1))
+    _, val3 = HF_ADDER((address // 16) % 4, MAX(carry2, add2))
+
+    return val1 + 4 * val2 + 16 * val3
+
+
+class PagedStore:
+    """
+    Sparse digit store of `size` cells: pages of `page` cells are
+    allocated on first write, unwritten cells read 0. Indexes like a list.
+    """
+
+    def __init__(self, size, page=256):
+        self.size = size
+        self.page = page
+        self.pages = {}
+
+    def __len__(self):
+        return self.size
+
+    def _check(self, i):
+        if not 0 <= i < self.size:
+            raise IndexError(f"Address {i} is outside {self.size} cells")
+
+    def __getitem__(self, i):
+        self._check(i)
+        cells = self.pages.get(i // self.page)
+        return 0 if cells is None else cells[i % self.page]
+
+    def __setitem__(self, i, value):
+        self._check(i)
+        cells = self.pages.get(i // self.page)
+        if cells is None:
+            if value == 0:
+                return
+            cells = self.pages[i // self.page] = bytearray(self.page)
+        cells[i % self.page] = value
+
+    def read_range(self, start, count):
+        _check_range(start, count, self.size)
+        return [self[i] for i in range(start, start + count)]
+
+    def write_range(self, start, values):
+        values = bytes(values)
+        _check_range(start, len(values), self.size)
+        page = self.page
+        i = 0
+        while i < len(values):
+            addr = start + i
+            n = min(page - addr % page, len(values) - i)
+            cells = self.pages.get(addr // page)
+            if cells is None:
+                cells = self.pages[addr // page] = bytearray(page)
+            cells[addr % page:addr % page + n] = values[i:i + n]
+            i += n
+
+
+class RAMN:
+    """
+    RAM with `width` address digits (4 ** width cells) on a PagedStore and
+    a COUNTERN program counter. run() takes `width` address digits, least
+    significant first, then Set and Value, like RAM3.run. Fetch does one
+    page lookup and one COUNTERN step per digit; a step ripples through
+    the counter's digits, so it grows with the width.
+    """
+
+    def __init__(self, width=3, page=256):
+        self.width = width
+        self.cells = PagedStore(4 ** width, page)
+        self.C = COUNTERN(width)
+
+    def address(self):
+        return self.C.address()
+
+    def _set_address(self, address):
+        self.C._set_address(address)
+
+    def _run(self, *args):
+        *adr, Set, Value = args
+        if len(adr) != self.width or not all(0 <= a <= 3 for a in adr):
+            return 0
+        i = sum(a * 4 ** k for k, a in enumerate(adr))
+        if Set > 0:
+            self.cells[i] = Value
+
+        return MIN(self.cells[i], 3)
+
+    def load_digits(self, digits, entry=0):
+        if len(digits) > len(self.cells):
+            raise ValueError(f"Program of {len(digits)} digits does not fit in {len(self.cells)} cells")
+        self.cells.write_range(0, digits)
+        self._set_address(entry % len(self.cells))
+
+    def read_range(self, start, count):
+        return self.cells.read_range(start, count)
+
+    def write_range(self, start, values):
+        self.cells.write_range(start, values)
+
+    def fetch(self):
+        instr, n = _fetch_cells(self.cells, self.address())
+        for _ in range(n):
+            self.C.run(1)
+
+        return instr
+
+    def run(self, *args):
+        self._run(*args)
+
+        if args[-2] > 0:
+            return
+
+        return self.fetch()
+
+
+class RAM3Array:
+    """
+    RAM3 with the same run()/_run()/advGet() contract, backed by a
+    64-cell bytearray (linear address Adr0 + 4 * Adr1 + 16 * Adr2) and an
+    integer program counter. read_range/write_range move whole blocks.
+    """
+
+    def __init__(self):
+        self.cells = bytearray(64)
+        self.pc = 0
+
+    def address(self):
+        return self.pc
+
+    def load_digits(self, digits, entry=0):
+        if len(digits) > len(self.cells):
+            raise ValueError(f"Program of {len(digits)} digits does not fit in {len(self.cells)} cells")
+        self.write_range(0, digits)
+        self.pc = entry % len(self.cells)
+
+    def _run(self, Adr0, Adr1, Adr2, Set, Value):
+        if not (0 <= Adr0 <= 3 and 0 <= Adr1 <= 3 and 0 <= Adr2 <= 3):
+            return 0
+        i = Adr0 + 4 * Adr1 + 16 * Adr2
+        if Set > 0:
+            self.cells[i] = Value
+
+        return MIN(self.cells[i], 3)
+
+    def fetch(self):
+        return self.run(0, 0, 0, 0, 0)
+
+    def advGet(self, st0, st1, st2, ADR0, ADR1, ADR2):
+        val = self._run(ADR0, ADR1, ADR2, 0, 0)
+        self.pc = _count3(self.pc, st0, st1, st2)
+
+        return val, self.pc % 4, (self.pc // 4) % 4, self.pc // 16
+
+    def run(self, AD0, AD1, AD2, Set, Var):
+        self._run(AD0, AD1, AD2, Set, Var)
+
+        if Set > 0:
+            return
+
+        instr, n = _fetch_cells(self.cells, self.pc)
+        self.pc = (self.pc + n) % len(self.cells)
+
+        return instr
+
+    def read_range(self, start, count):
+        _check_range(start, count, len(self.cells))
+        return list(self.cells[start:start + count])
+
+    def write_range(self, start, values):
+        values = bytes(values)
+        _check_range(start, len(values), len(self.cells))
+        self.cells[start:start + len(values)] = values
+
+
 class CPU:
     def __init__(self, varReg: RG16, flagReg: RG16):
         self.var_reg = varReg
@@ -422,57 +740,208 @@ class CPU:
         #  A2, B2, C2, D2 = Adr4(instr1, D) -> functions
 
 
-from compiler import compile_asm
+def _alu_table():
+    # (flag, value) of M_ALU for every arithmetic/logic opcode and operand
+    # pair, taken from the gate-level ALU so both engines agree by design.
+    table = {}
+    for instr0 in (0, 1):
+        for instr1 in range(4):
+            rows = []
+            for a in range(4):
+                rows.append(tuple(M_ALU(a, b, instr0, instr1, RG16()) for b in range(4)))
+            table[(instr0, instr1)] = tuple(rows)
+    return table
+
+
+_ALU = _alu_table()
+
+
+class LockstepDivergence(RuntimeError):
+    pass
+
+
+class ISA:
+    """
+    Functional model of the same machine: RAM, registers and flags are
+    flat lists, one instruction is a table lookup plus a few list writes.
+    Register (X, Y) of RG16 is cell 4 * X + Y; operands address (A, 0).
+    """
+
+    def __init__(self, size=64, paged=False):
+        self.mem = PagedStore(size) if paged else [0] * size
+        self.var = [0] * 16
+        self.flags = [0] * 16
+        self.pc = 0
+
+    def load_digits(self, digits, entry=0):
+        if len(digits) > len(self.mem):
+            raise ValueError(f"Program of {len(digits)} digits does not fit in {len(self.mem)} cells")
+        for addr, val in enumerate(digits):
+            self.mem[addr] = val
+        self.pc = entry % len(self.mem)
+
+    def fetch(self):
+        instr, n = _fetch_cells(self.mem, self.pc)
+        self.pc = (self.pc + n) % len(self.mem)
+        return instr
+
+    @staticmethod
+    def _cell(adr):
+        return 4 * adr if 0 <= adr <= 3 else None
+
+    def _read(self, rnf, adr):
+        if rnf == 2:
+            return MIN(3, adr)
+        if rnf > 1:
+            return 0
+        cell = self._cell(adr)
+        if cell is None:
+            return 0
+        return MIN(3, (self.var if rnf == 0 else self.flags)[cell])
+
+    def execute(self, instr0, instr1, RNF0=0, RNF1=0, A=0, B=0):
+        V1 = self._read(RNF0, A)
+        V2 = self._read(RNF1, B)
+        a = self._cell(A)
+        b = self._cell(B)
+
+        if instr0 in (0, 1):
+            flag, val = _ALU[(instr0, instr1)][V1][V2] if (instr0, instr1) in _ALU else (0, 0)
+            if instr0 == 0 and a is not None:
+                self.flags[a] = flag
+            if a is not None:
+                self.var[a] = val
+        elif instr0 == 2:
+            if instr1 in (0, 1) and a is not None:
+                self.var[a] = V2
+            elif instr1 == 2 and b is not None:
+                self.var[b] = V1
+            elif instr1 == 3:
+                self.flags[15] = 3
+
+    def halted(self):
+        return self.flags[15] != 0
+
+    def step(self):
+        instr = self.fetch()
+        self.execute(*instr)
+        return instr
+
+    def run(self, max_steps=None):
+        steps = 0
+        while not self.halted():
+            if max_steps is not None and steps >= max_steps:
+                break
+            self.step()
+            steps += 1
+        return steps
+
+
+def _dump(name, read):
+    print(name)
+    for Y in range(4):
+        for X in range(4):
+            print(read(X, Y))
 
-def PC():
-    with open("code.asm", "r") as f:
-        asm_program = f.read()
+        print(" ")
 
-    machine_code = compile_asm(asm_program)
-    
-    _RAM = RAM3()
+
+from compiler import assemble, load_image, pack_digits
+
+
+def _program(source="code.asm", image="code.qimg"):
+    # Reuse the packed image while it is newer than the source and still
+    # loads (an older image format does not), otherwise recompile and
+    # rewrite it.
+    if os.path.exists(image) and os.path.getmtime(image) >= os.path.getmtime(source):
+        try:
+            return load_image(image)
+        except ValueError:
+            pass
+    with open(source, "r") as f:
+        data = pack_digits(assemble(f))
+    with open(image, "wb") as f:
+        f.write(data)
+    return load_image(image)
+
+
+def _width(n):
+    width = 3
+    while 4 ** width < n:
+        width += 1
+    return width
+
+
+def PC(mode="gate", storage="tree", width=None):
+    """
+    mode "gate" runs the gate-level CPU, "functional" the ISA model and
+    "lockstep" both side by side, raising LockstepDivergence at the first
+    instruction after which registers, flags or program counter differ.
+    storage "array" swaps RAM3/RG16 for their bytearray-backed versions,
+    "paged" uses RAMN with `width` address digits (by default the
+    smallest that holds the program). The 64-cell storages refuse
+    programs that do not fit. The program comes from code.asm via the
+    cached image code.qimg.
+    """
+    if mode not in ("gate", "functional", "lockstep"):
+        raise ValueError(f"Unknown mode: {mode}")
+    if storage not in ("tree", "array", "paged"):
+        raise ValueError(f"Unknown storage: {storage}")
+
+    entry, digits = _program()
+    if storage == "paged":
+        width = _width(len(digits)) if width is None else int(width)
+    else:
+        width = 3
+
+    if mode != "gate":
+        _ISA = ISA(4 ** width, paged=storage == "paged")
+        _ISA.load_digits(digits, entry)
+
+    if mode == "functional":
+        _ISA.run()
+        _dump("VAR_REG:", lambda X, Y: _ISA.var[4 * X + Y])
+        _dump("FLAG_REG:", lambda X, Y: _ISA.flags[4 * X + Y])
+        return
     
-    # Load machine code into RAM
-    # Each instruction takes 6 slots in RAM (mapped by instruction pointer)
-    for i, instr in enumerate(machine_code):
-        # Flatten instruction (6 digits) and store in RAM
-        # Our RAM is 3D: Adr0, Adr1, Adr2
-        for j, val in enumerate(instr):
-            # Calculate linear address j + i*6
-            addr = i * 6 + j
-            # Convert linear address to 3D address (4x4x4)
-            a0 = addr % 4
-            a1 = (addr // 4) % 4
-            a2 = (addr // 16) % 4
-            _RAM.run(a0, a1, a2, 3, val)
-
-    _VAR_REG = RG16()
-    _FLAG_REG = RG16()
+    if storage == "paged":
+        _RAM, _VAR_REG, _FLAG_REG = RAMN(width), RG16Array(), RG16Array()
+    elif storage == "array":
+        _RAM, _VAR_REG, _FLAG_REG = RAM3Array(), RG16Array(), RG16Array()
+    else:
+        _RAM, _VAR_REG, _FLAG_REG = RAM3(), RG16(), RG16()
+    _RAM.load_digits(digits, entry)
 
     _CPU = CPU(_VAR_REG, _FLAG_REG)
 
+    step = 0
     while _FLAG_REG.run(3, 3, 0, 0) == 0:
-        RET = _RAM.run(0, 0, 0, 0, 0)
+        RET = _RAM.fetch()
         _CPU.run(*RET)
 
-    print("VAR_REG:")
-    for Y in range(4):
-        for X in range(4):
-            print(_VAR_REG.run(X, Y, 0, 0))
-
-        print(" ")
+        if mode == "lockstep":
+            expected = _ISA.step()
+            gate = ([_VAR_REG.run(i // 4, i % 4, 0, 0) for i in range(16)],
+                    [_FLAG_REG.run(i // 4, i % 4, 0, 0) for i in range(16)],
+                    _RAM.address())
+            functional = (_ISA.var, _ISA.flags, _ISA.pc)
+            if RET != expected or gate != functional:
+                raise LockstepDivergence(
+                    f"step {step}: gate {RET} -> {gate}, functional {expected} -> {functional}")
+        step += 1
 
-    print("FLAG_REG:")
-    for Y in range(4):
-        for X in range(4):
-            print(_FLAG_REG.run(X, Y, 0, 0))
-
-        print(" ")
+    if storage != "tree":
+        var, flags = _VAR_REG.read_range(0, 16), _FLAG_REG.read_range(0, 16)
+        _dump("VAR_REG:", lambda X, Y: var[4 * X + Y])
+        _dump("FLAG_REG:", lambda X, Y: flags[4 * X + Y])
+        return
 
+    _dump("VAR_REG:", lambda X, Y: _VAR_REG.run(X, Y, 0, 0))
+    _dump("FLAG_REG:", lambda X, Y: _FLAG_REG.run(X, Y, 0, 0))
 
 
 def main():
-    PC()
+    PC(*sys.argv[1:4])
 
 
 if __name__ == '__main__':